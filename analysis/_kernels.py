@@ -0,0 +1,47 @@
+"""
+Numba kerneli za analizu (opciono).
+
+Modul se uvozi lenjo, tek kada analiza zaista radi, jer kompajliranje/učitavanje
+keša kernela traje. Ako numba nije instalirana, HAS_NUMBA je False i pozivaoci
+koriste NumPy putanju.
+"""
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba je opciona
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(
+        "int64(int64[:], int64[:], int64[:], int64[:], int64[:], int64[:], "
+        "int64[:], int64[:], int64, int64[:], int64[:])",
+        cache=True,
+        nogil=True,
+    )
+    def bbox_overlap_pairs(min_x, max_x, min_y, max_y, ptr, members, cxs, cys, cell, out_i, out_j):
+        """Parovi box-ova koji se preklapaju, za sve ćelije spatial hash-a odjednom.
+
+        Ćelija b sadrži indekse members[ptr[b]:ptr[b + 1]] i ima koordinate
+        (cxs[b], cys[b]). Par se upisuje samo u ćeliji donjeg levog ugla preseka.
+        Vraća broj upisanih parova u out_i/out_j. Otpušta GIL, pa se
+        disjunktni blokovi ćelija mogu obrađivati iz više niti.
+        """
+        cnt = 0
+        for b in range(ptr.size - 1):
+            cx = cxs[b]
+            cy = cys[b]
+            end = ptr[b + 1]
+            for a in range(ptr[b], end):
+                i = members[a]
+                for c in range(a + 1, end):
+                    j = members[c]
+                    if (min_x[i] <= max_x[j] and max_x[i] >= min_x[j] and
+                            min_y[i] <= max_y[j] and max_y[i] >= min_y[j]):
+                        if (max(min_x[i], min_x[j]) // cell == cx and
+                                max(min_y[i], min_y[j]) // cell == cy):
+                            out_i[cnt] = i
+                            out_j[cnt] = j
+                            cnt += 1
+        return cnt
@@ -13,27 +13,81 @@ Pretpostavke o inputima (fleksibilne):
   * `wire_length`: numerička vrednost (ako postoji)
 - `routing_data` je dict sa dodatnim informacijama npr. `edge_congestion` mapa (edge -> value)
 
-Zahtevi zavise od biblioteka: koristi se numpy, networkx, scikit-learn (KMeans).
-Ako nisu u projektu - dodati u requirements.txt: numpy, networkx, scikit-learn
+Zahtevi zavise od biblioteka: koristi se numpy, scipy, networkx, scikit-learn (KMeans).
+Ako nisu u projektu - dodati u requirements.txt: numpy, scipy, networkx, scikit-learn
+Opciono: numba (JIT pretraga najbližeg čvora); bez nje se koristi scipy cdist.
+Opciono: faiss (k-means za vrlo velike skupove signala); bez njega sklearn.
 
 """
 from __future__ import annotations
 
 import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 import networkx as nx
-from sklearn.cluster import KMeans
+from scipy.spatial.distance import cdist
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.exceptions import ConvergenceWarning
 import warnings
 
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba je opciona
+    HAS_NUMBA = False
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:  # faiss je opciona
+    HAS_FAISS = False
+
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# ispod ovog broja signala koristi se pun KMeans, iznad MiniBatchKMeans
+MINIBATCH_MIN_SAMPLES = 1000
+# od ovog broja signala koristi se faiss.Kmeans (ako je faiss instaliran)
+FAISS_MIN_SAMPLES = 10000
+
+# maksimalan broj keširanih n-hop okolina po analizatoru
+NHOP_CACHE_SIZE = 8192
+
+# cached_property atributi AdvancedAnalyzer-a koji zavise od grafa
+_GRAPH_CACHED_PROPERTIES = ("_node_idx", "_deg_arr", "_csr", "avg_degree")
+
+
+if HAS_NUMBA:
+    # fastmath bez 'nnan'/'ninf': koordinate i rezultat ostaju precizno definisani
+    @njit(parallel=True, fastmath={'nsz', 'arcp', 'contract', 'afn', 'reassoc'}, cache=True)
+    def _nearest_distances_jit(qxs, qys, xs, ys):
+        """Za svaki upit (qx, qy) vraća udaljenost do najbliže tačke iz (xs, ys).
+
+        xs/ys ne smeju biti prazni (proverava _nearest_node_distances); minimum
+        kreće od prve tačke umesto od beskonačnosti.
+        """
+        out = np.empty(qxs.size, dtype=np.float64)
+        for q in prange(qxs.size):
+            qx = qxs[q]
+            qy = qys[q]
+            dx = xs[0] - qx
+            dy = ys[0] - qy
+            best = dx * dx + dy * dy
+            for i in range(1, xs.size):
+                dx = xs[i] - qx
+                dy = ys[i] - qy
+                d = dx * dx + dy * dy
+                if d < best:
+                    best = d
+            out[q] = math.sqrt(best)
+        return out
+
 
 @dataclass
 class SubgraphNSAnalysisResult:
@@ -101,6 +155,8 @@ class AdvancedAnalyzer:
         report = analyzer.run_all()
 
     Metode su dizajnirane da budu samostalne i mogu se pozivati pojedinačno.
+    Pretpostavlja se da se `graph` ne menja tokom života analizatora; ako se
+    promeni, pozvati `invalidate_cache()`.
     """
 
     def __init__(
@@ -113,15 +169,195 @@ class AdvancedAnalyzer:
         # normalize signals to a list of dicts
         self.signals = list(signals) if signals is not None else []
         self.routing_data = routing_data or {}
+        # keš koordinata čvorova (SoA) za pretragu najbližeg čvora
+        self._pos_attr: Optional[str] = None
+        self._pos_xs: Optional[np.ndarray] = None
+        self._pos_ys: Optional[np.ndarray] = None
+        self._pos_ids: List[Any] = []
+        self._pos_index: Dict[Any, int] = {}
+        # ograničen LRU keš n-hop okolina: (endpoint, n) -> skup dostižnih čvorova
+        self._nhop = lru_cache(maxsize=NHOP_CACHE_SIZE)(self._nhop_bfs)
+        # signali normalizovani u SoA oblik (jedan prolaz kroz dict-ove)
+        self._signal_names: List[str] = []
+        self._ep_nodes: List[Tuple[Any, ...]] = []
+        self._ep_src: Optional[np.ndarray] = None
+        self._ep_dst: Optional[np.ndarray] = None
+        self._ep_src_in_graph: Optional[np.ndarray] = None
+        self._ep_dst_in_graph: Optional[np.ndarray] = None
+        self._path_lens: Optional[np.ndarray] = None
+        self._wire_len: Optional[np.ndarray] = None
+        self._ensure_signal_arrays()
 
     # -------------------------- helpers --------------------------
+    def invalidate_cache(self) -> None:
+        """Briše keširane podatke izvedene iz grafa (pozvati ako se `graph` promeni)."""
+        self._pos_attr = None
+        self._pos_xs = None
+        self._pos_ys = None
+        self._pos_ids = []
+        self._pos_index = {}
+        for name in _GRAPH_CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
+        self._nhop.cache_clear()
+        self._ep_src = None
+
+    def _in_graph(self, ep: Any) -> bool:
+        try:
+            return ep in self.graph
+        except TypeError:  # npr. lista koordinata (nehashable)
+            return False
+
+    def _ensure_signal_arrays(self) -> None:
+        """Jednom normalizuje signale u nizove (endpointi, dužine putanja, wire_length).
+
+        `_ep_src`/`_ep_dst` su indeksi čvorova iz `_node_idx` (-1 ako endpoint nije u grafu).
+        """
+        if self._ep_src is not None:
+            return
+        N = len(self.signals)
+        names: List[str] = []
+        ep_nodes: List[Tuple[Any, ...]] = []
+        ep_src = np.full(N, -1, dtype=np.intp)
+        ep_dst = np.full(N, -1, dtype=np.intp)
+        path_lens = np.empty(N, dtype=np.int64)
+        wire_len = np.empty(N, dtype=np.float64)
+        for i, sig in enumerate(self.signals):
+            names.append(sig.get("name", "unnamed"))
+            endpoints = (sig.get("endpoints") or [])[:2]
+            in_graph = []
+            for j, ep in enumerate(endpoints):
+                if self._in_graph(ep):
+                    in_graph.append(ep)
+                    if j == 0:
+                        ep_src[i] = self._node_idx[ep]
+                    else:
+                        ep_dst[i] = self._node_idx[ep]
+            ep_nodes.append(tuple(in_graph))
+            path_lens[i] = len(sig.get("path") or [])
+            wire_len[i] = self._safe_get_path_length(sig)
+        self._signal_names = names
+        self._ep_nodes = ep_nodes
+        self._ep_src_in_graph = ep_src >= 0
+        self._ep_dst_in_graph = ep_dst >= 0
+        self._path_lens = path_lens
+        self._wire_len = wire_len
+        self._ep_src = ep_src
+        self._ep_dst = ep_dst
+
+    def _nhop_bfs(self, ep: Any, n: int) -> frozenset:
+        """Čvorovi na udaljenosti <= n od `ep`.
+
+        Poziva se preko `self._nhop`, LRU keša po (ep, n), pa se BFS za endpoint
+        koji deli više signala izvršava samo jednom.
+        """
+        return frozenset(nx.single_source_shortest_path_length(self.graph, ep, cutoff=n))
+
+    def _count_induced_edges(self, nodes: Iterable[Any]) -> int:
+        """Broj grana indukovanog podgrafa, preko CSR matrice susedstva grafa."""
+        idx = np.fromiter((self._node_idx[v] for v in nodes), dtype=np.intp)
+        sub = self._csr[idx][:, idx]
+        if self.graph.is_directed():
+            return int(sub.nnz)
+        # neusmeren graf: svaka grana je upisana dvaput, petlje samo jednom
+        loops = int(np.count_nonzero(sub.diagonal()))
+        return (int(sub.nnz) + loops) // 2
+
+    def _density(self, k: int, m: int) -> float:
+        """Gustina podgrafa sa k čvorova i m grana (isto kao nx.density)."""
+        if k <= 1:
+            return 0.0
+        d = m / (k * (k - 1))
+        return d if self.graph.is_directed() else 2 * d
+
+    # Invarijante izvedene iz grafa. Analizator pretpostavlja da se graf ne menja
+    # tokom njegovog života; ako se promeni, pozvati invalidate_cache().
+    @cached_property
+    def _node_idx(self) -> Dict[Any, int]:
+        """Mapa čvor -> indeks (redosled iz graph.nodes())."""
+        return {n: i for i, n in enumerate(self.graph.nodes())}
+
+    @cached_property
+    def _deg_arr(self) -> np.ndarray:
+        """Stepen svakog čvora, poravnat sa `_node_idx`.
+
+        graph.degree() obilazi čvorove istim redom kao graph.nodes(), pa se
+        stepeni upisuju direktno u niz bez međulista.
+        """
+        G = self.graph
+        return np.fromiter((d for _, d in G.degree()), dtype=np.int32, count=G.number_of_nodes())
+
+    @cached_property
+    def _csr(self):
+        """CSR matrica susedstva grafa, poravnata sa `_node_idx`."""
+        return nx.to_scipy_sparse_array(
+            self.graph, nodelist=list(self._node_idx), weight=None, format="csr"
+        )
+
+    @cached_property
+    def avg_degree(self) -> float:
+        """Prosečan stepen čvora u grafu."""
+        return float(self._deg_arr.mean()) if self._deg_arr.size else 0.0
+
+    def _build_pos_arrays(self, coordinate_attr: str = "pos") -> None:
+        """Jednom prolazi kroz čvorove i pravi kolone `xs`, `ys` sa koordinatama."""
+        if self._pos_xs is not None and self._pos_attr == coordinate_attr:
+            return
+        ids: List[Any] = []
+        xs: List[float] = []
+        ys: List[float] = []
+        for n, d in self.graph.nodes(data=True):
+            pos = d.get(coordinate_attr)
+            if not pos:
+                continue
+            try:
+                px, py = pos
+                px, py = float(px), float(py)
+            except (TypeError, ValueError):
+                continue
+            ids.append(n)
+            xs.append(px)
+            ys.append(py)
+        self._pos_attr = coordinate_attr
+        self._pos_ids = ids
+        self._pos_index = {n: i for i, n in enumerate(ids)}
+        self._pos_xs = np.asarray(xs, dtype=np.float64)
+        self._pos_ys = np.asarray(ys, dtype=np.float64)
+
+    def _nearest_node_distances(self, queries: List[Tuple[float, float]]) -> np.ndarray:
+        """Udaljenost od svake tačke iz `queries` do najbližeg čvora sa koordinatama."""
+        if not queries or not self._pos_xs.size:
+            return np.zeros(0, dtype=np.float64)
+        Q = np.asarray(queries, dtype=np.float64)
+        if HAS_NUMBA:
+            return _nearest_distances_jit(
+                np.ascontiguousarray(Q[:, 0]), np.ascontiguousarray(Q[:, 1]), self._pos_xs, self._pos_ys
+            )
+        P = np.column_stack((self._pos_xs, self._pos_ys))
+        D = cdist(Q, P)
+        idx = D.argmin(axis=1)
+        return D[np.arange(len(Q)), idx]
+
+    def _symmetric_edge_congestion(self) -> Dict[Any, float]:
+        """edge_congestion mapa sa dodatim obrnutim ključevima (b, a).
+
+        Direktni ključevi imaju prednost, pa je jedan `get` ekvivalentan
+        ranijem traženju (a, b) pa (b, a).
+        """
+        edge_cong_map = self.routing_data.get("edge_congestion", {})
+        canon = {k: float(v) for k, v in edge_cong_map.items()}
+        for k, v in edge_cong_map.items():
+            if isinstance(k, tuple) and len(k) == 2:
+                canon.setdefault((k[1], k[0]), float(v))
+        return canon
+
     @staticmethod
     def _safe_get_path_length(signal: Dict[str, Any]) -> float:
         # prefer explicit wire_length, else fallback to len(path)-1
-        if signal.get("wire_length") is not None:
-            return float(signal["wire_length"])
-        path = signal.get("path") or []
-        return float(max(0, len(path) - 1))
+        wl = signal.get("wire_length")
+        if wl is not None:
+            return float(wl)
+        path = signal.get("path")
+        return float(len(path) - 1) if path else 0.0
 
     @staticmethod
     def _euclidean_distance(a: Tuple[float, float], b: Tuple[float, float]) -> float:
@@ -139,29 +375,26 @@ class AdvancedAnalyzer:
         - merimo veličinu i gustinu
         - vračamo top K po veličini
         """
-        subgraphs = []
-        for sig in self.signals:
-            endpoints = sig.get("endpoints") or []
+        self._ensure_signal_arrays()
+        node_sets = []
+        for eps in self._ep_nodes:
             # podržimo jedan ili dva endpointa
             nodes_set = set()
-            for ep in endpoints[:2]:
-                if ep in self.graph:
-                    nodes = nx.single_source_shortest_path_length(self.graph, ep, cutoff=n).keys()
-                    nodes_set.update(nodes)
+            for ep in eps:
+                nodes_set.update(self._nhop(ep, n))
             if nodes_set:
-                subg = self.graph.subgraph(nodes_set).copy()
-                subgraphs.append(subg)
+                node_sets.append(nodes_set)
 
-        sizes = [g.number_of_nodes() for g in subgraphs]
-        dens = [nx.density(g) if g.number_of_nodes() > 0 else 0.0 for g in subgraphs]
+        sizes = [len(ns) for ns in node_sets]
+        dens = [self._density(len(ns), self._count_induced_edges(ns)) for ns in node_sets]
 
         # top_k subgraphs by size
         sorted_idx = np.argsort(sizes)[::-1][:top_k]
-        top_subgraphs = [list(subgraphs[i].nodes()) for i in sorted_idx if i < len(subgraphs)]
+        top_subgraphs = [list(self.graph.subgraph(node_sets[i]).nodes()) for i in sorted_idx if i < len(node_sets)]
 
         res = SubgraphNSAnalysisResult(
             n=n,
-            subgraphs_count=len(subgraphs),
+            subgraphs_count=len(node_sets),
             sizes=sizes,
             densitites=dens,
             top_subgraphs=top_subgraphs,
@@ -178,33 +411,30 @@ class AdvancedAnalyzer:
         """
         offsets = []
         per_signal = {}
+        self._build_pos_arrays(coordinate_attr)
+
+        # prvi prolaz: ofseti za node id endpointe + skupljanje koordinata za upite.
+        # Upiti se beleže kao indeks u `queries` da bi se kasnije rešili odjednom.
+        queries: List[Tuple[float, float]] = []
+        pending: List[Tuple[str, List[Tuple[bool, float]]]] = []
 
         for sig in self.signals:
             name = sig.get("name", "unnamed")
             endpoints = sig.get("endpoints") or []
             # ako endpoints imaju koordinate direktno
-            local_offsets = []
+            local_entries: List[Tuple[bool, float]] = []
             for ep in endpoints[:2]:
                 # ep može biti node id ili koordinata tuple
                 if isinstance(ep, (list, tuple)) and len(ep) == 2 and not (ep in self.graph):
-                    # tuple coords
-                    # attempt to match to nearest node
-                    coords = tuple(ep)
-                    # find nearest node that has coordinates
-                    best = None
-                    best_d = float("inf")
-                    for n, d in self.graph.nodes(data=True):
-                        pos = d.get(coordinate_attr)
-                        if pos:
-                            try:
-                                dist = self._euclidean_distance(coords, tuple(pos))
-                            except Exception:
-                                continue
-                            if dist < best_d:
-                                best_d = dist
-                                best = n
-                    if best is not None:
-                        local_offsets.append(float(best_d))
+                    # tuple coords - najbliži čvor tražimo kasnije za sve upite zajedno
+                    if self._pos_xs.size:
+                        # neispravan endpoint (npr. nepostojeći čvor ('n', 5) ili None) se preskače
+                        try:
+                            query = (float(ep[0]), float(ep[1]))
+                        except (TypeError, ValueError):
+                            continue
+                        local_entries.append((True, len(queries)))
+                        queries.append(query)
                 else:
                     # ep is probably a node id
                     node = ep
@@ -220,13 +450,20 @@ class AdvancedAnalyzer:
                         if rep and node_pos:
                             try:
                                 d = self._euclidean_distance(tuple(node_pos), tuple(rep))
-                                local_offsets.append(float(d))
+                                local_entries.append((False, float(d)))
                             except Exception:
                                 continue
-            if local_offsets:
-                mean_off = float(np.mean(local_offsets))
-                offsets.extend(local_offsets)
-                per_signal[name] = mean_off
+            if local_entries:
+                pending.append((name, local_entries))
+
+        # jedan cdist poziv za sve koordinatne endpointe
+        nearest = self._nearest_node_distances(queries)
+
+        for name, local_entries in pending:
+            local_offsets = [float(nearest[v]) if is_query else v for is_query, v in local_entries]
+            mean_off = float(np.mean(local_offsets))
+            offsets.extend(local_offsets)
+            per_signal[name] = mean_off
 
         if offsets:
             avg = float(np.mean(offsets))
@@ -256,17 +493,27 @@ class AdvancedAnalyzer:
             else:
                 mean_per_iter = []
         else:
-            mean_per_iter = []
-            for grid in congestion_history:
-                arr = np.array(grid)
-                mean_per_iter.append(float(np.nanmean(arr)))
+            grids = [np.asarray(grid) for grid in congestion_history]
+            first_shape = grids[0].shape
+            if all(g.shape == first_shape for g in grids):
+                # isti oblik - jedan stek i jedna redukcija po iteraciji
+                H = np.stack(grids)
+                axes = tuple(range(1, H.ndim))
+                mean_per_iter = np.nanmean(H, axis=axes).tolist() if axes else H.astype(float).tolist()
+            else:
+                # različiti oblici - redukcija direktno nad postojećim baferima (bez kopije)
+                mean_per_iter = [float(np.nanmean(g)) for g in grids]
 
         iterations = len(mean_per_iter)
         if iterations >= 2:
-            x = np.arange(iterations)
-            y = np.array(mean_per_iter)
-            # linear trend
-            slope, intercept = np.polyfit(x, y, 1)
+            y = np.asarray(mean_per_iter, dtype=np.float64)
+            # linear trend - zatvorena forma najmanjih kvadrata za x = 0..n-1
+            n = iterations
+            xm = (n - 1) / 2.0
+            sxx = n * (n * n - 1) / 12.0
+            sxy = float(((np.arange(n) - xm) * (y - y.mean())).sum())
+            slope = sxy / sxx
+            intercept = float(y.mean()) - slope * xm
         else:
             slope = 0.0
             intercept = mean_per_iter[0] if mean_per_iter else 0.0
@@ -278,6 +525,9 @@ class AdvancedAnalyzer:
     def signal_cluster_analysis(self, n_clusters: int = 4, features: Optional[List[str]] = None, random_state: int = 0) -> SignalClusterResult:
         """Klaster analiza signala koristeći KMeans.
 
+        Za velike skupove signala (>= MINIBATCH_MIN_SAMPLES) koristi se MiniBatchKMeans,
+        a za vrlo velike (>= FAISS_MIN_SAMPLES) faiss.Kmeans ako je dostupan.
+
         Podrazumevane karakteristike se grade iz signala:
         - wire_length (ako postoji)
         - path_length (len(path))
@@ -289,67 +539,96 @@ class AdvancedAnalyzer:
         if features is None:
             features = ["wire_length", "path_len", "avg_edge_cong", "endpoint_degree"]
 
-        X = []
-        names = []
-        edge_cong_map = self.routing_data.get("edge_congestion", {})
-
-        for sig in self.signals:
-            names.append(sig.get("name", "unnamed"))
-            vals = []
-            # wire_length
-            wl = sig.get("wire_length")
-            if wl is None:
-                wl = self._safe_get_path_length(sig)
-            vals.append(float(wl))
-            # path_len
-            path_len = len(sig.get("path") or [])
-            vals.append(float(path_len))
-            # avg_edge_cong
-            path = sig.get("path") or []
-            if path and len(path) > 1:
-                edge_vals = []
-                for a, b in zip(path[:-1], path[1:]):
-                    e = (a, b)
-                    # undirected fallback
-                    if e not in edge_cong_map and (b, a) in edge_cong_map:
-                        e = (b, a)
-                    v = edge_cong_map.get(e, 0.0)
-                    edge_vals.append(float(v))
-                avg_edge = float(np.mean(edge_vals)) if edge_vals else 0.0
-            else:
-                avg_edge = 0.0
-            vals.append(avg_edge)
-            # endpoint degree
-            endpoints = sig.get("endpoints") or []
-            degs = []
-            for ep in endpoints[:2]:
-                if ep in self.graph:
-                    degs.append(self.graph.degree(ep))
-            ep_deg = float(np.mean(degs)) if degs else 0.0
-            vals.append(ep_deg)
-
-            X.append(vals)
-
-        X = np.array(X, dtype=float) if X else np.zeros((0, len(features)))
-
-        if X.shape[0] == 0:
+        N = len(self.signals)
+        if N == 0:
             return SignalClusterResult(n_clusters=0, labels=[], centroids=[])
 
-        # normalize features to zero mean unit var to help clustering
-        X_mean = X.mean(axis=0)
-        X_std = X.std(axis=0)
-        X_std[X_std == 0] = 1.0
-        Xn = (X - X_mean) / X_std
+        edge_cong_map = self._symmetric_edge_congestion()
+        self._ensure_signal_arrays()
+
+        # wire_length (ili dužina putanje) i broj čvorova putanje su već normalizovani
+        wl_col = self._wire_len
+        pl_col = self._path_lens.astype(np.float64)
+
+        # avg_edge_cong
+        aec_col = np.zeros(N, dtype=np.float64)
+        for i, sig in enumerate(self.signals):
+            if self._path_lens[i] > 1:
+                path = sig["path"]
+                edge_vals = np.fromiter(
+                    (edge_cong_map.get(e, 0.0) for e in zip(path[:-1], path[1:])),
+                    dtype=np.float64,
+                    count=len(path) - 1,
+                )
+                aec_col[i] = edge_vals.mean()
+
+        # endpoint degree - prosek stepena endpointa koji postoje u grafu
+        ed_col = np.zeros(N, dtype=np.float64)
+        if self._deg_arr.size:
+            src_ok = self._ep_src_in_graph
+            dst_ok = self._ep_dst_in_graph
+            deg_sum = (
+                np.where(src_ok, self._deg_arr[self._ep_src], 0)
+                + np.where(dst_ok, self._deg_arr[self._ep_dst], 0)
+            ).astype(np.float64)
+            cnt = src_ok.astype(np.int64) + dst_ok
+            np.divide(deg_sum, cnt, out=ed_col, where=cnt > 0)
+
+        X = np.column_stack((wl_col, pl_col, aec_col, ed_col))
 
         # choose n_clusters not greater than samples
-        k = min(n_clusters, Xn.shape[0])
-
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore", ConvergenceWarning)
-            kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
-            labels = kmeans.fit_predict(Xn)
+        k = min(n_clusters, N)
+
+        # trivijalni slučajevi bez KMeans-a: jedan klaster, ili svaki signal svoj klaster
+        if k <= 1:
+            res = SignalClusterResult(n_clusters=1, labels=[0] * N, centroids=[X.mean(axis=0).tolist()])
+            logger.info("signal_cluster_analysis finished: clusters=%d", res.n_clusters)
+            return res
+        if N <= k:
+            res = SignalClusterResult(n_clusters=N, labels=list(range(N)), centroids=X.tolist())
+            logger.info("signal_cluster_analysis finished: clusters=%d", res.n_clusters)
+            return res
+
+        # normalize features to zero mean unit var to help clustering;
+        # konstantne kolone (std == 0) ne doprinose rastojanjima pa se izbacuju
+        X_mean = X.mean(axis=0)
+        X_std = X.std(axis=0)
+        keep = X_std > 0
+        if not keep.any():
+            # svi signali imaju iste karakteristike
+            res = SignalClusterResult(n_clusters=1, labels=[0] * N, centroids=[X_mean.tolist()])
+            logger.info("signal_cluster_analysis finished: clusters=%d", res.n_clusters)
+            return res
+        Xn = (X[:, keep] - X_mean[keep]) / X_std[keep]
+
+        if HAS_FAISS and N >= FAISS_MIN_SAMPLES:
+            Xf = np.ascontiguousarray(Xn, dtype=np.float32)
+            km = faiss.Kmeans(d=Xf.shape[1], k=k, niter=20, nredo=3, seed=random_state)
+            km.train(Xf)
+            _, I = km.index.search(Xf, 1)
+            labels = I[:, 0].astype(np.int64)
+            centers = km.centroids.astype(np.float64)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", ConvergenceWarning)
+                if N < MINIBATCH_MIN_SAMPLES:
+                    kmeans = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+                else:
+                    kmeans = MiniBatchKMeans(
+                        n_clusters=k,
+                        random_state=random_state,
+                        batch_size=min(1024, N),
+                        n_init=3,
+                        max_iter=100,
+                        reassignment_ratio=0.01,
+                    )
+                labels = kmeans.fit_predict(Xn)
+            centers = kmeans.cluster_centers_
 
-        centroids = (kmeans.cluster_centers_ * X_std + X_mean).tolist()
+        # centroidi nazad u originalne jedinice; izbačene kolone su konstante
+        full = np.tile(X_mean, (centers.shape[0], 1))
+        full[:, keep] = centers * X_std[keep] + X_mean[keep]
+        centroids = full.tolist()
 
         res = SignalClusterResult(n_clusters=k, labels=labels.tolist(), centroids=centroids)
         logger.info("signal_cluster_analysis finished: clusters=%d", k)
@@ -364,13 +643,13 @@ class AdvancedAnalyzer:
         - standardna devijacija dužine puteva
         - entropija zagušenja na ivicama (ako postoji edge_congestion)
         """
-        degrees = [d for n, d in self.graph.degree()]
-        avg_deg = float(np.mean(degrees)) if degrees else 0.0
+        avg_deg = self.avg_degree
 
-        path_lengths = [self._safe_get_path_length(s) for s in self.signals]
-        if path_lengths:
-            avg_pl = float(np.mean(path_lengths))
-            std_pl = float(np.std(path_lengths))
+        self._ensure_signal_arrays()
+        path_lengths = self._wire_len
+        if path_lengths.size:
+            avg_pl = float(path_lengths.mean())
+            std_pl = float(path_lengths.std())
         else:
             avg_pl = 0.0
             std_pl = 0.0
@@ -378,15 +657,16 @@ class AdvancedAnalyzer:
         edge_cong = list(self.routing_data.get("edge_congestion", {}).values())
         if edge_cong:
             # normalize to probabilities and compute entropy
-            arr = np.array(edge_cong, dtype=float)
-            if np.any(arr < 0):
+            arr = np.asarray(edge_cong, dtype=np.float64)
+            if arr.min() < 0:
                 arr = arr - arr.min()  # shift
             s = arr.sum()
             if s == 0:
                 entropy = 0.0
             else:
                 p = arr / s
-                entropy = float(-np.sum([x * np.log2(x) for x in p if x > 0]))
+                p = p[p > 0]
+                entropy = float(-(p * np.log2(p)).sum())
         else:
             entropy = 0.0
 
@@ -476,16 +756,16 @@ class AdvancedAnalyzer:
         sc = report.signal_clusters
         if sc and sc.n_clusters > 0:
             # gather cluster stats
-            labels = np.array(sc.labels)
-            # compute approx cluster sizes
-            unique, counts = np.unique(labels, return_counts=True)
-            big_clusters = unique[counts > max(5, int(0.1 * len(labels)))] if len(labels) > 0 else []
-            if len(big_clusters) > 0:
+            labels = np.asarray(sc.labels, dtype=np.intp)
+            # cluster sizes - labele su u [0, k), pa je bincount dovoljan (bez sortiranja)
+            counts = np.bincount(labels, minlength=sc.n_clusters)
+            big_clusters = np.nonzero(counts > max(5, int(0.1 * len(labels))))[0]
+            if big_clusters.size > 0:
                 recomms.append(
                     OptimizationRecommendation(
                         priority="MEDIUM",
                         message="Detected big clusters of signals — consider logical regrouping or floorplanning to localize traffic.",
-                        details={"big_clusters": big_clusters.tolist() if hasattr(big_clusters, 'tolist') else list(big_clusters)},
+                        details={"big_clusters": big_clusters.tolist()},
                     )
                 )
 
@@ -503,13 +783,27 @@ class AdvancedAnalyzer:
         """Pokreši sve glavne analize i skupi izveštaj.
 
         Ova metoda je korisna za brzinski izvšetak cele analize.
+        Nezavisne analize se izvršavaju paralelno u thread pool-u, dok se
+        analize koje su već interno paralelne (klasterovanje, numba pretraga
+        najbližeg čvora) rade u glavnom thread-u.
         """
         report = AdvancedAnalysisReport()
-        report.subgraph_ns = self.subgraph_ns_analysis(n=n_subgraph)
-        report.endpoint_offsets = self.endpoint_offset_analysis()
-        report.congestion_evolution = self.congestion_evolution()
-        report.signal_clusters = self.signal_cluster_analysis(n_clusters=n_clusters)
-        report.routing_complexity = self.routing_complexity()
+        # zajednički keševi se grade unapred da ih thread-ovi samo čitaju
+        self._ensure_signal_arrays()
+        self._build_pos_arrays()
+        _ = self.avg_degree  # gradi i _node_idx, _deg_arr
+
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            futs = {
+                "subgraph_ns": ex.submit(self.subgraph_ns_analysis, n=n_subgraph),
+                "congestion_evolution": ex.submit(self.congestion_evolution),
+                "routing_complexity": ex.submit(self.routing_complexity),
+            }
+            report.endpoint_offsets = self.endpoint_offset_analysis()
+            report.signal_clusters = self.signal_cluster_analysis(n_clusters=n_clusters)
+            for attr, fut in futs.items():
+                setattr(report, attr, fut.result())
+
         report.recommendations = self.generate_optimization_recommendations(report)
         return report
 
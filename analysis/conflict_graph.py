@@ -1,19 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
+from scipy.sparse import csgraph, csr_array
 from typing import List, Dict, Tuple, Set, Union
 from models.circuit import Circuit, Signal
 from models.routing import RoutingResult, NetRoute
 from models.fpga_architecture import BoundingBox, Point
 
+# Segmenti se ključuju celim brojem (x << 40) + (y << 20) + type_id umesto
+# stringom; ključ je jedinstven dok je |y| < 2**19 i type_id < 2**20
+# (koordinate mogu biti i -1).
+_KEY_BITS = 20
+_KEY_MASK = (1 << _KEY_BITS) - 1
+_KEY_HALF = 1 << (_KEY_BITS - 1)
+
+# Broj izvora za aproksimaciju betweenness centralnosti u identify_hubs
+HUB_SAMPLE_SIZE = 128
+
+# Od ovog broja box-ova se narrow phase deli na više niti
+BBOX_PARALLEL_MIN_BOXES = 2000
+
+# Vizuelizacija: broj keširanih rasporeda, najveći graf za kamada_kawai
+# i najveći graf kome se crtaju labele
+LAYOUT_CACHE_SIZE = 8
+KAMADA_KAWAI_MAX_NODES = 100
+LABELS_MAX_NODES = 200
+
+
+def _unpack_segment_key(key: int) -> Tuple[int, int, int]:
+    """Vraća (x, y, type_id) iz celobrojnog ključa segmenta"""
+    type_id = key & _KEY_MASK
+    rest = key >> _KEY_BITS
+    y = ((rest + _KEY_HALF) & _KEY_MASK) - _KEY_HALF
+    x = (rest - y) >> _KEY_BITS
+    return x, y, type_id
+
+
+def _group_shared_keys(keys: np.ndarray, owners: np.ndarray) -> Dict[int, np.ndarray]:
+    """Grupiše parove (ključ, vlasnik) sortiranjem i vraća samo ključeve sa >1 vlasnikom.
+    
+    Rezultat je ključ -> niz različitih vlasnika, a ključevi su poređani po
+    prvom pojavljivanju u ulazu (isti redosled kao punjenje dict-a u petlji).
+    """
+    if keys.size == 0:
+        return {}
+    
+    order = np.lexsort((owners, keys))
+    k = keys[order]
+    o = owners[order]
+    
+    # početak svake grupe istog ključa i prvo pojavljivanje ključa u ulazu
+    new_key = np.empty(k.size, dtype=bool)
+    new_key[0] = True
+    np.not_equal(k[1:], k[:-1], out=new_key[1:])
+    starts = np.flatnonzero(new_key)
+    first_seen = np.minimum.reduceat(order, starts)
+    
+    # jedinstveni parovi (ključ, vlasnik)
+    new_pair = new_key.copy()
+    new_pair[1:] |= o[1:] != o[:-1]
+    key_id = np.cumsum(new_key) - 1
+    n_owners = np.bincount(key_id[new_pair], minlength=starts.size)
+    owner_starts = np.concatenate(([0], np.cumsum(n_owners)[:-1]))
+    o = o[new_pair]
+    
+    shared = np.flatnonzero(n_owners > 1)
+    shared = shared[np.argsort(first_seen[shared], kind='stable')]
+    return {int(k[starts[g]]): o[owner_starts[g]:owner_starts[g] + n_owners[g]]
+            for g in shared.tolist()}
+
+
 class ConflictGraphBuilder:
     """Klasa za građenje i analizu konflikt grafa"""
     
     def __init__(self):
         self.conflict_graph = nx.Graph()
+        # Keš centralnosti: (metoda, broj čvorova, broj grana) -> {čvor: centralnost}
+        self._centrality_cache = {}
+        # Keš labela povezanih komponenti za trenutni graf
+        self._components_cache = {}
+        # Keš analize za vizuelizaciju: (V, E, id grafa) -> (habovi, metrike)
+        self._analysis_cache = {}
+        # Keš rasporeda čvorova: (layout, potpis grafa) -> pos; preživljava
+        # ponovno građenje istog grafa (svaki web zahtev gradi graf iznova)
+        self._layout_cache = {}
     
     def build_conflict_graph(self, data: Union[Circuit, RoutingResult]) -> nx.Graph:
         """Građi konflikt graf za dato kolo ili routing"""
         self.conflict_graph.clear()
+        self._centrality_cache.clear()
+        self._analysis_cache.clear()
+        self._components_cache = {}
         
         # Proveri tip podataka
         if isinstance(data, RoutingResult):
@@ -25,24 +105,26 @@ class ConflictGraphBuilder:
     
     def _build_from_circuit(self, circuit: Circuit) -> nx.Graph:
         """Građi konflikt graf iz Circuit objekta (legacy)"""
-        # Dodavanje svih aktivnih signala kao čvorova
+        # Aktivni signali se računaju jednom i prosleđuju detektorima
         active_signals = circuit.get_active_signals()
-        for signal in active_signals:
-            self.conflict_graph.add_node(signal.name, signal=signal)
+        
+        # Dodavanje svih aktivnih signala kao čvorova (jednim pozivom)
+        self.conflict_graph.add_nodes_from((signal.name, {'signal': signal})
+                                           for signal in active_signals)
         
         # Detekcija konflikata baziranih na bounding box preklapanju
-        self._detect_bounding_box_conflicts_circuit(circuit)
+        self._detect_bounding_box_conflicts_circuit(circuit, active_signals)
         
         # Detekcija konflikata baziranih na deljenju routing resursa
-        self._detect_routing_conflicts_circuit(circuit)
+        self._detect_routing_conflicts_circuit(active_signals)
         
         return self.conflict_graph
     
     def _build_from_routing(self, routing: RoutingResult) -> nx.Graph:
         """Građi konflikt graf iz Routing objekta"""
-        # Dodavanje svih net-ova kao čvorova
-        for route in routing.routes:
-            self.conflict_graph.add_node(route.net_name, route=route)
+        # Dodavanje svih net-ova kao čvorova (jednim pozivom)
+        self.conflict_graph.add_nodes_from((route.net_name, {'route': route})
+                                           for route in routing.routes)
         
         # Detekcija konflikata baziranih na bounding box preklapanju
         self._detect_bounding_box_conflicts_routing(routing)
@@ -52,27 +134,18 @@ class ConflictGraphBuilder:
         
         return self.conflict_graph
     
-    def _detect_bounding_box_conflicts_circuit(self, circuit: Circuit):
+    def _detect_bounding_box_conflicts_circuit(self, circuit: Circuit, active_signals: List[Signal]):
         """Detektuje konflikte bazirane na preklapanju bounding box-ova (Circuit)"""
-        signal_bboxes = {}
-        
-        # Računanje bounding box-ova za sve signale
-        for signal in circuit.get_active_signals():
-            signal_bboxes[signal.name] = signal.get_bounding_box()
-        
-        # Provera preklapanja za svaki par signala
-        signal_names = list(signal_bboxes.keys())
-        for i in range(len(signal_names)):
-            for j in range(i + 1, len(signal_names)):
-                signal1 = signal_names[i]
-                signal2 = signal_names[j]
-                
-                bbox1 = signal_bboxes[signal1]
-                bbox2 = signal_bboxes[signal2]
-                
-                if bbox1.overlaps(bbox2):
-                    self.conflict_graph.add_edge(signal1, signal2, 
-                                               conflict_type='bbox_overlap')
+        # Bounding box-ovi svih signala odjednom, nad pakovanim rutama
+        min_x, min_y, max_x, max_y = circuit.all_bounding_boxes(active_signals)
+        signal_bboxes = {
+            signal.name: {'min_x': x0, 'max_x': x1, 'min_y': y0, 'max_y': y1}
+            for signal, x0, y0, x1, y1 in zip(active_signals, min_x.tolist(), min_y.tolist(),
+                                             max_x.tolist(), max_y.tolist())
+        }
+        
+        self.conflict_graph.add_edges_from(self._find_overlapping_pairs(signal_bboxes),
+                                           conflict_type='bbox_overlap')
     
     def _detect_bounding_box_conflicts_routing(self, routing: RoutingResult):
         """Detektuje konflikte bazirane na preklapanju bounding box-ova (Routing)"""
@@ -84,19 +157,107 @@ class ConflictGraphBuilder:
             if bbox:
                 route_bboxes[route.net_name] = bbox
         
-        # Provera preklapanja za svaki par route-ova
-        route_names = list(route_bboxes.keys())
-        for i in range(len(route_names)):
-            for j in range(i + 1, len(route_names)):
-                route1 = route_names[i]
-                route2 = route_names[j]
-                
-                bbox1 = route_bboxes[route1]
-                bbox2 = route_bboxes[route2]
-                
-                if self._bboxes_overlap(bbox1, bbox2):
-                    self.conflict_graph.add_edge(route1, route2, 
-                                               conflict_type='bbox_overlap')
+        self.conflict_graph.add_edges_from(self._find_overlapping_pairs(route_bboxes),
+                                           conflict_type='bbox_overlap')
+    
+    def _find_overlapping_pairs(self, bboxes: Dict[str, Dict[str, int]],
+                                cell: int = None, n_jobs: int = None) -> List[Tuple[str, str]]:
+        """Vraća parove imena čiji se bounding box-ovi preklapaju.
+        
+        Broad phase je uniformna mreža ćelija (spatial hash): kandidati su samo
+        box-ovi koji dele ćeliju. Tačan test se radi numba kernelom (ako je
+        dostupan) ili vektorski (NumPy) nad svim parovima u ćeliji; par se
+        prijavljuje samo u ćeliji u kojoj počinje njihov presek, pa nema
+        duplikata između ćelija.
+        
+        Sa numba kernelom i bar BBOX_PARALLEL_MIN_BOXES box-ova ćelije se dele
+        na `n_jobs` niti (podrazumevano broj CPU jezgara).
+        """
+        # lenji uvoz - kernel se učitava tek kada analiza radi
+        from . import _kernels
+        
+        if cell is None:
+            cell = self._default_cell_size(bboxes)
+        
+        names = list(bboxes.keys())
+        n = len(names)
+        boxes = bboxes.values()
+        min_x = np.fromiter((b['min_x'] for b in boxes), dtype=np.int64, count=n)
+        max_x = np.fromiter((b['max_x'] for b in boxes), dtype=np.int64, count=n)
+        min_y = np.fromiter((b['min_y'] for b in boxes), dtype=np.int64, count=n)
+        max_y = np.fromiter((b['max_y'] for b in boxes), dtype=np.int64, count=n)
+        
+        buckets = [(key, members) for key, members in self._bbox_spatial_hash(bboxes, cell).items()
+                   if len(members) > 1]
+        if not buckets:
+            return []
+        
+        if _kernels.HAS_NUMBA:
+            sizes = np.fromiter((len(m) for _, m in buckets), dtype=np.int64, count=len(buckets))
+            ptr = np.zeros(len(buckets) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=ptr[1:])
+            members = np.fromiter((i for _, m in buckets for i in m), dtype=np.int64, count=int(ptr[-1]))
+            cxs = np.fromiter((key[0] for key, _ in buckets), dtype=np.int64, count=len(buckets))
+            cys = np.fromiter((key[1] for key, _ in buckets), dtype=np.int64, count=len(buckets))
+            # broj kandidat parova po ćeliji (gornja granica izlaza)
+            cand = np.cumsum(sizes * (sizes - 1) // 2)
+            
+            def run(b0: int, b1: int) -> Tuple[np.ndarray, np.ndarray]:
+                """Kernel nad ćelijama [b0, b1); ptr ostaje apsolutan u `members`"""
+                cap = int(cand[b1 - 1] - (cand[b0 - 1] if b0 else 0))
+                out_i = np.empty(cap, dtype=np.int64)
+                out_j = np.empty(cap, dtype=np.int64)
+                cnt = _kernels.bbox_overlap_pairs(min_x, max_x, min_y, max_y, ptr[b0:b1 + 1],
+                                                  members, cxs[b0:b1], cys[b0:b1], int(cell),
+                                                  out_i, out_j)
+                return out_i[:cnt], out_j[:cnt]
+            
+            if n_jobs is None:
+                n_jobs = os.cpu_count() or 1
+            if n >= BBOX_PARALLEL_MIN_BOXES and n_jobs > 1:
+                # kernel otpušta GIL, pa niti rade paralelno; blokovi ćelija se
+                # dele po broju kandidat parova, a rezultat zadržava redosled
+                bounds = np.searchsorted(cand, cand[-1] * np.arange(1, n_jobs) / n_jobs, side='right')
+                bounds = np.unique(np.concatenate(([0], bounds, [len(buckets)])))
+                with ThreadPoolExecutor(max_workers=n_jobs) as ex:
+                    parts = list(ex.map(run, bounds[:-1].tolist(), bounds[1:].tolist()))
+                out_i = np.concatenate([p[0] for p in parts])
+                out_j = np.concatenate([p[1] for p in parts])
+            else:
+                out_i, out_j = run(0, len(buckets))
+            return [(names[i], names[j]) for i, j in zip(out_i.tolist(), out_j.tolist())]
+        
+        pairs = []
+        for (cx, cy), members in buckets:
+            m = np.asarray(members)
+            lx, hx, ly, hy = min_x[m], max_x[m], min_y[m], max_y[m]
+            hit = ((lx[:, None] <= hx[None, :]) & (hx[:, None] >= lx[None, :]) &
+                   (ly[:, None] <= hy[None, :]) & (hy[:, None] >= ly[None, :]))
+            # ćelija donjeg levog ugla preseka
+            hit &= np.maximum(lx[:, None], lx[None, :]) // cell == cx
+            hit &= np.maximum(ly[:, None], ly[None, :]) // cell == cy
+            i_idx, j_idx = np.nonzero(np.triu(hit, k=1))
+            pairs.extend((names[i], names[j]) for i, j in zip(m[i_idx].tolist(), m[j_idx].tolist()))
+        
+        return pairs
+    
+    def _bbox_spatial_hash(self, bboxes: Dict[str, Dict[str, int]],
+                           cell: int = 64) -> Dict[Tuple[int, int], List[int]]:
+        """Mapira ćeliju (cx, cy) na indekse box-ova (redosled iz `bboxes`) koji je pokrivaju"""
+        buckets = {}
+        for idx, bbox in enumerate(bboxes.values()):
+            for cx in range(bbox['min_x'] // cell, bbox['max_x'] // cell + 1):
+                for cy in range(bbox['min_y'] // cell, bbox['max_y'] // cell + 1):
+                    buckets.setdefault((cx, cy), []).append(idx)
+        return buckets
+    
+    def _default_cell_size(self, bboxes: Dict[str, Dict[str, int]]) -> int:
+        """Veličina ćelije prema prosečnoj ivici box-a, da box pokriva svega par ćelija"""
+        if not bboxes:
+            return 1
+        total = sum(max(b['max_x'] - b['min_x'], b['max_y'] - b['min_y']) + 1
+                    for b in bboxes.values())
+        return max(1, -(-total // len(bboxes)))
     
     def _calculate_route_bounding_box(self, route: NetRoute) -> Dict[str, int]:
         """Izračunava bounding box za NetRoute"""
@@ -124,112 +285,199 @@ class ConflictGraphBuilder:
                    bbox1['max_y'] < bbox2['min_y'] or 
                    bbox1['min_y'] > bbox2['max_y'])
     
-    def _detect_routing_conflicts_circuit(self, circuit: Circuit):
-        """Detektuje konflikte bazirane na preklapanju bounding box-ova"""
-        signal_bboxes = {}
-        
-        # Računanje bounding box-ova za sve signale
-        for signal in circuit.get_active_signals():
-            signal_bboxes[signal.name] = signal.get_bounding_box()
-        
-        # Provera preklapanja za svaki par signala
-        signal_names = list(signal_bboxes.keys())
-        for i in range(len(signal_names)):
-            for j in range(i + 1, len(signal_names)):
-                signal1 = signal_names[i]
-                signal2 = signal_names[j]
-                
-                bbox1 = signal_bboxes[signal1]
-                bbox2 = signal_bboxes[signal2]
-                
-                if bbox1.overlaps(bbox2):
-                    self.conflict_graph.add_edge(signal1, signal2, 
-                                               conflict_type='bbox_overlap')
-    
-    def _detect_routing_conflicts_circuit(self, circuit: Circuit):
+    def _detect_routing_conflicts_circuit(self, active_signals: List[Signal]):
         """Detektuje konflikte bazirane na deljenju routing resursa (Circuit)"""
-        segment_usage = {}
-        
-        # Grupisanje signala po korišćenim segmentima
-        for signal in circuit.get_active_signals():
-            if signal.route:
-                for point in signal.route:
-                    segment_key = f"{point.x},{point.y}"
-                    if segment_key not in segment_usage:
-                        segment_usage[segment_key] = set()
-                    segment_usage[segment_key].add(signal.name)
+        # Koordinate svih tačaka svih ruta u jednom prolazu; vlasnik je indeks signala
+        lengths = np.fromiter((len(signal.route) for signal in active_signals),
+                              dtype=np.int64, count=len(active_signals))
+        total = int(lengths.sum())
+        xs = np.fromiter((p.x for signal in active_signals for p in signal.route),
+                         dtype=np.int64, count=total)
+        ys = np.fromiter((p.y for signal in active_signals for p in signal.route),
+                         dtype=np.int64, count=total)
+        owners = np.repeat(np.arange(len(active_signals), dtype=np.int64), lengths)
+        
+        # Grupisanje signala po korišćenim segmentima (sortiranjem, bez dict-a po tački)
+        keys = (xs << 40) + (ys << _KEY_BITS)
+        segment_usage = {key: idx.tolist() for key, idx in _group_shared_keys(keys, owners).items()}
         
         # Dodavanje grana za signale koji dele iste segmente
-        for segment, signals in segment_usage.items():
-            if len(signals) > 1:
-                signal_list = list(signals)
-                for i in range(len(signal_list)):
-                    for j in range(i + 1, len(signal_list)):
-                        if not self.conflict_graph.has_edge(signal_list[i], signal_list[j]):
-                            self.conflict_graph.add_edge(signal_list[i], signal_list[j],
-                                                       conflict_type='shared_segment',
-                                                       segment=segment)
+        def segment_label(key: int) -> str:
+            x, y, _ = _unpack_segment_key(key)
+            return f"{x},{y}"
+        
+        self._add_shared_segment_edges(segment_usage, segment_label,
+                                       owner_names=[signal.name for signal in active_signals])
     
     def _detect_routing_conflicts_routing(self, routing: RoutingResult):
         """Detektuje konflikte bazirane na deljenju routing resursa (Routing)"""
-        segment_usage = {}
-        
-        # Grupisanje net-ova po korišćenim segmentima (x,y koordinatama)
-        for route in routing.routes:
-            if route.segments:
-                for segment in route.segments:
-                    # Kreiraj ključ za segment baziran na x,y,type
-                    segment_key = f"{segment.x},{segment.y},{segment.node_type}"
-                    if segment_key not in segment_usage:
-                        segment_usage[segment_key] = set()
-                    segment_usage[segment_key].add(route.net_name)
+        routes = routing.routes
+        type_ids = {}
+        
+        # Koordinate i tipovi svih segmenata u SoA nizovima; vlasnik je indeks rute
+        lengths = np.fromiter((len(route.segments) if route.segments else 0 for route in routes),
+                              dtype=np.int64, count=len(routes))
+        total = int(lengths.sum())
+        xs = np.fromiter((seg.x for route in routes if route.segments for seg in route.segments),
+                         dtype=np.int64, count=total)
+        ys = np.fromiter((seg.y for route in routes if route.segments for seg in route.segments),
+                         dtype=np.int64, count=total)
+        # tipovi se numerišu redom pojavljivanja
+        tids = np.fromiter((type_ids.setdefault(seg.node_type, len(type_ids))
+                            for route in routes if route.segments for seg in route.segments),
+                           dtype=np.int64, count=total)
+        owners = np.repeat(np.arange(len(routes), dtype=np.int64), lengths)
+        
+        # Grupisanje net-ova po segmentima (x,y,type) sortiranjem umesto dict-a setova
+        keys = (xs << 40) + (ys << _KEY_BITS) + tids
+        segment_usage = {key: idx.tolist() for key, idx in _group_shared_keys(keys, owners).items()}
+        
+        type_names = list(type_ids)
         
         # Dodavanje grana za net-ove koji dele iste segmente
-        for segment, nets in segment_usage.items():
-            if len(nets) > 1:
-                net_list = list(nets)
-                for i in range(len(net_list)):
-                    for j in range(i + 1, len(net_list)):
-                        if not self.conflict_graph.has_edge(net_list[i], net_list[j]):
-                            self.conflict_graph.add_edge(net_list[i], net_list[j],
-                                                       conflict_type='shared_segment',
-                                                       segment=segment)
+        def segment_label(key: int) -> str:
+            x, y, type_id = _unpack_segment_key(key)
+            return f"{x},{y},{type_names[type_id]}"
+        
+        self._add_shared_segment_edges(segment_usage, segment_label,
+                                       owner_names=[route.net_name for route in routes])
+    
+    def _add_shared_segment_edges(self, segment_usage: Dict[int, List[int]], segment_label,
+                                  owner_names: List[str]):
+        """Dodaje shared_segment grane za sve parove koji dele segment, jednim add_edges_from.
+        
+        Vlasnici u `segment_usage` su indeksi u `owner_names` (imena se čitaju
+        tek pri dodavanju grana). Par dobija prvi segment u kom se pojavio;
+        grane koje već postoje (npr. bbox_overlap) se ne prepisuju.
+        """
+        edge_segments = {}
+        for key, owners in segment_usage.items():
+            if len(owners) > 1:
+                for pair in combinations(sorted(owners), 2):
+                    if pair not in edge_segments:
+                        edge_segments[pair] = key
+        
+        named = {}
+        for (i, j), key in edge_segments.items():
+            if owner_names[i] != owner_names[j]:
+                named.setdefault((owner_names[i], owner_names[j]), key)
+        
+        adj = self.conflict_graph.adj
+        self.conflict_graph.add_edges_from(
+            (a, b, {'conflict_type': 'shared_segment', 'segment': segment_label(key)})
+            for (a, b), key in named.items()
+            if b not in adj.get(a, ())
+        )
     
-    def identify_hubs(self, centrality_threshold: float = 0.1) -> List[str]:
-        """Identifikuje habove u konflikt grafu"""
+    def identify_hubs(self, centrality_threshold: float = 0.1,
+                      method: str = 'betweenness') -> List[str]:
+        """Identifikuje habove u konflikt grafu
+        
+        method: 'betweenness' (aproksimacija uzorkovanjem do HUB_SAMPLE_SIZE
+        izvora), 'degree' ili 'pagerank' (oba O(V+E)).
+        """
         if self.conflict_graph.number_of_nodes() == 0:
             return []
         
-        # Računanje betweenness centrality
-        centrality = nx.betweenness_centrality(self.conflict_graph)
+        centrality = self._get_centrality(method)
         
-        # Pronalaženje čvorova sa centralnošću iznad thresholda
-        hubs = [node for node, cent in centrality.items() 
-                if cent > centrality_threshold]
+        # Pronalaženje čvorova sa centralnošću iznad thresholda i sortiranje
+        # opadajuće (stabilno, kao sorted(..., reverse=True)) nad nizovima
+        nodes = list(centrality.keys())
+        values = np.fromiter(centrality.values(), dtype=np.float64, count=len(nodes))
+        idx = np.flatnonzero(values > centrality_threshold)
+        idx = idx[np.argsort(-values[idx], kind='stable')]
         
-        return sorted(hubs, key=lambda x: centrality[x], reverse=True)
+        return [nodes[i] for i in idx.tolist()]
+    
+    def _get_centrality(self, method: str) -> Dict[str, float]:
+        """Računa (ili vraća keširanu) centralnost čvorova konflikt grafa"""
+        graph = self.conflict_graph
+        key = (method, graph.number_of_nodes(), graph.number_of_edges())
+        if key in self._centrality_cache:
+            return self._centrality_cache[key]
+        
+        if method == 'betweenness':
+            # Tačan betweenness je O(V*E); za veće grafove se uzorkuju izvori
+            k = min(HUB_SAMPLE_SIZE, graph.number_of_nodes())
+            centrality = nx.betweenness_centrality(graph, k=k, seed=42)
+        elif method == 'degree':
+            centrality = nx.degree_centrality(graph)
+        elif method == 'pagerank':
+            centrality = nx.pagerank(graph)
+        else:
+            raise ValueError(f"Unsupported centrality method: {method}")
+        
+        self._centrality_cache[key] = centrality
+        return centrality
     
     def get_connected_components(self) -> List[Set[str]]:
         """Vraća povezane komponente konflikt grafa"""
-        return list(nx.connected_components(self.conflict_graph))
+        nodes, n_components, labels = self._get_component_labels()
+        if n_components == 0:
+            return []
+        
+        # Grupisanje čvorova po labeli komponente
+        order = np.argsort(labels, kind='stable')
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        node_arr = np.empty(len(nodes), dtype=object)
+        node_arr[:] = nodes
+        return [set(group.tolist()) for group in np.split(node_arr[order], bounds)]
     
-    def calculate_graph_metrics(self) -> Dict[str, float]:
-        """Računa metriku konflikt grafa"""
-        if self.conflict_graph.number_of_nodes() == 0:
+    def _get_component_labels(self) -> Tuple[List[str], int, np.ndarray]:
+        """Labele povezanih komponenti preko scipy csgraph (keširano po grafu)
+        
+        CSR matrica se gradi direktno iz liste suseda, bez COO međukoraka.
+        """
+        graph = self.conflict_graph
+        key = (graph.number_of_nodes(), graph.number_of_edges())
+        if self._components_cache.get('key') == key:
+            return self._components_cache['value']
+        
+        nodes = list(graph.nodes())
+        n = len(nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(nbrs) for _, nbrs in graph.adjacency()), dtype=np.int64, count=n),
+                  out=indptr[1:])
+        indices = np.fromiter((index[v] for _, nbrs in graph.adjacency() for v in nbrs),
+                              dtype=np.int64, count=int(indptr[-1]))
+        adjacency = csr_array((np.ones(indices.size, dtype=np.int8), indices, indptr), shape=(n, n))
+        n_components, labels = csgraph.connected_components(adjacency, directed=False)
+        
+        value = (nodes, int(n_components), labels)
+        self._components_cache = {'key': key, 'value': value}
+        return value
+    
+    def calculate_graph_metrics(self, expensive: bool = False) -> Dict[str, float]:
+        """Računa metriku konflikt grafa
+        
+        Koeficijent klasterovanja (O(V*d^2)) se računa samo uz expensive=True.
+        """
+        n = self.conflict_graph.number_of_nodes()
+        if n == 0:
             return {}
         
-        return {
-            'num_nodes': self.conflict_graph.number_of_nodes(),
-            'num_edges': self.conflict_graph.number_of_edges(),
+        m = self.conflict_graph.number_of_edges()
+        metrics = {
+            'num_nodes': n,
+            'num_edges': m,
             'density': nx.density(self.conflict_graph),
-            'avg_degree': sum(dict(self.conflict_graph.degree()).values()) / 
-                         self.conflict_graph.number_of_nodes(),
-            'clustering_coefficient': nx.average_clustering(self.conflict_graph),
-            'connected_components': nx.number_connected_components(self.conflict_graph)
+            # zbir stepena je 2*E
+            'avg_degree': 2 * m / n,
         }
+        if expensive:
+            metrics['clustering_coefficient'] = nx.average_clustering(self.conflict_graph)
+        metrics['connected_components'] = self._get_component_labels()[1]
+        
+        return metrics
     
-    def visualize_conflict_graph(self, highlight_hubs: bool = True) -> plt.Figure:
-        """Vizuelizuje konflikt graf"""
+    def visualize_conflict_graph(self, highlight_hubs: bool = True,
+                                 layout: str = 'spring') -> plt.Figure:
+        """Vizuelizuje konflikt graf
+        
+        layout: 'spring' ili 'kamada_kawai' (samo za male grafove, inače spring).
+        """
         fig, ax = plt.subplots(figsize=(12, 8))
         
         if self.conflict_graph.number_of_nodes() == 0:
@@ -238,17 +486,15 @@ class ConflictGraphBuilder:
             return fig
         
         # Pozicioniranje čvorova
-        pos = nx.spring_layout(self.conflict_graph, seed=42)
+        pos = self._get_layout(layout)
         
-        # Bojenje čvorova - habovi su crveni
-        node_colors = []
-        hubs = set(self.identify_hubs()) if highlight_hubs else set()
+        # Habovi i metrike se računaju jednom po grafu
+        hub_list, metrics = self._get_or_compute_analysis()
         
-        for node in self.conflict_graph.nodes():
-            if node in hubs:
-                node_colors.append('red')
-            else:
-                node_colors.append('lightblue')
+        # Bojenje čvorova - habovi su crveni
+        hubs = set(hub_list) if highlight_hubs else set()
+        node_colors = np.where([node in hubs for node in self.conflict_graph.nodes()],
+                               'red', 'lightblue')
         
         # Crtanje grafa
         nx.draw_networkx_nodes(self.conflict_graph, pos, 
@@ -258,8 +504,10 @@ class ConflictGraphBuilder:
         nx.draw_networkx_edges(self.conflict_graph, pos, 
                               alpha=0.5, edge_color='gray', ax=ax)
         
-        nx.draw_networkx_labels(self.conflict_graph, pos, 
-                               font_size=8, ax=ax)
+        # Labele se ne crtaju za velike grafove (nečitljive, a skupe)
+        if self.conflict_graph.number_of_nodes() <= LABELS_MAX_NODES:
+            nx.draw_networkx_labels(self.conflict_graph, pos, 
+                                   font_size=8, ax=ax)
         
         # Legenda
         if highlight_hubs and hubs:
@@ -271,7 +519,6 @@ class ConflictGraphBuilder:
         ax.axis('off')
         
         # Dodavanje metrika
-        metrics = self.calculate_graph_metrics()
         metrics_text = "\n".join([f"{k}: {v:.3f}" for k, v in metrics.items()])
         ax.text(0.02, 0.98, metrics_text, transform=ax.transAxes,
                verticalalignment='top', fontsize=10,
@@ -279,6 +526,42 @@ class ConflictGraphBuilder:
         
         return fig
     
+    def _get_or_compute_analysis(self) -> Tuple[List[str], Dict[str, float]]:
+        """Vraća (habovi, metrike) za trenutni graf, memoizovano do sledećeg build-a"""
+        graph = self.conflict_graph
+        key = (graph.number_of_nodes(), graph.number_of_edges(), id(graph))
+        analysis = self._analysis_cache.get(key)
+        if analysis is None:
+            analysis = (self.identify_hubs(), self.calculate_graph_metrics(expensive=False))
+            self._analysis_cache[key] = analysis
+        return analysis
+    
+    def _get_layout(self, layout: str = 'spring') -> Dict[str, Tuple[float, float]]:
+        """Vraća (keširan) raspored čvorova za trenutni konflikt graf"""
+        graph = self.conflict_graph
+        n = graph.number_of_nodes()
+        if layout == 'kamada_kawai' and n > KAMADA_KAWAI_MAX_NODES:
+            layout = 'spring'
+        
+        key = (layout, n, graph.number_of_edges(),
+               hash(frozenset(graph.nodes())), hash(frozenset(graph.edges())))
+        pos = self._layout_cache.get(key)
+        if pos is not None:
+            return pos
+        
+        if layout == 'spring':
+            pos = nx.spring_layout(graph, seed=42)
+        elif layout == 'kamada_kawai':
+            pos = nx.kamada_kawai_layout(graph)
+        else:
+            raise ValueError(f"Unsupported layout: {layout}")
+        
+        # Izbacivanje najstarijeg rasporeda kada je keš pun
+        if len(self._layout_cache) >= LAYOUT_CACHE_SIZE:
+            self._layout_cache.pop(next(iter(self._layout_cache)))
+        self._layout_cache[key] = pos
+        return pos
+    
     def get_conflicts_for_signal(self, signal_name: str) -> List[str]:
         """Vraća signale u konfliktu sa datim signalom"""
         if signal_name not in self.conflict_graph:
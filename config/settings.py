@@ -1,29 +1,69 @@
 import os
 from dataclasses import dataclass
+from typing import Tuple
 
-@dataclass
+# Putanje
+UPLOAD_FOLDER = "uploads"
+OUTPUT_FOLDER = "output"
+STATIC_FOLDER = "static"
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB blokovi pri upisu upload-a
+MAX_UPLOAD_SIZE = 2 << 30  # 2 GiB; veći zahtev se odbija sa 413
+
+# Parsiranje
+PARSE_WORKERS = os.cpu_count() or 1  # procesi za parsiranje .route fajlova; 0 = u niti zahteva
+
+# Vizuelizacija
+RENDER_WORKERS = os.cpu_count() or 1  # procesi za crtanje /api/visualize slika; 0 = u niti zahteva
+CELL_SIZE = 100  # Increased from 50 for better visibility
+CANVAS_PADDING = 100
+SIGNAL_COLORS = ('red', 'green', 'blue', 'magenta', 'cyan', 'orange')
+HEATMAP_ANTIALIASED = True  # False = heat mapa se crta bez antialiasing-a (brže za velike dizajne)
+
+# Analiza
+CONGESTION_THRESHOLD = 0.8
+HUB_CENTRALITY_THRESHOLD = 0.1
+
+# Web server
+HOST = "localhost"
+PORT = 5000
+DEBUG = True
+LOG_LEVEL = "INFO"  # nivo logovanja kada DEBUG nije uključen (npr. "WARNING" u produkciji)
+USE_X_SENDFILE = False  # True kada nginx/Apache ispred aplikacije šalje fajlove (X-Sendfile)
+
+@dataclass(frozen=True, slots=True)
 class Settings:
+    """Nepromenljiva podešavanja; vrednosti su i konstante modula za direktan uvoz"""
     # Putanje
-    UPLOAD_FOLDER = "uploads"
-    OUTPUT_FOLDER = "output"
-    STATIC_FOLDER = "static"
+    UPLOAD_FOLDER: str = UPLOAD_FOLDER
+    OUTPUT_FOLDER: str = OUTPUT_FOLDER
+    STATIC_FOLDER: str = STATIC_FOLDER
+    UPLOAD_CHUNK_SIZE: int = UPLOAD_CHUNK_SIZE
+    MAX_UPLOAD_SIZE: int = MAX_UPLOAD_SIZE
+    
+    # Parsiranje
+    PARSE_WORKERS: int = PARSE_WORKERS
     
     # Vizuelizacija
-    CELL_SIZE = 100  # Increased from 50 for better visibility
-    CANVAS_PADDING = 100
-    SIGNAL_COLORS = ['red', 'green', 'blue', 'magenta', 'cyan', 'orange']
+    RENDER_WORKERS: int = RENDER_WORKERS
+    CELL_SIZE: int = CELL_SIZE
+    CANVAS_PADDING: int = CANVAS_PADDING
+    SIGNAL_COLORS: Tuple[str, ...] = SIGNAL_COLORS
+    HEATMAP_ANTIALIASED: bool = HEATMAP_ANTIALIASED
     
     # Analiza
-    CONGESTION_THRESHOLD = 0.8
-    HUB_CENTRALITY_THRESHOLD = 0.1
+    CONGESTION_THRESHOLD: float = CONGESTION_THRESHOLD
+    HUB_CENTRALITY_THRESHOLD: float = HUB_CENTRALITY_THRESHOLD
     
     # Web server
-    HOST = "localhost"
-    PORT = 5000
-    DEBUG = True
+    HOST: str = HOST
+    PORT: int = PORT
+    DEBUG: bool = DEBUG
+    LOG_LEVEL: str = LOG_LEVEL
+    USE_X_SENDFILE: bool = USE_X_SENDFILE
 
 settings = Settings()
 
-# Kreiranje direktorijuma ako ne postoje
-os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(settings.OUTPUT_FOLDER, exist_ok=True)
\ No newline at end of file
+def init_directories():
+    """Kreira upload i output direktorijume ako ne postoje"""
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(OUTPUT_FOLDER, exist_ok=True)
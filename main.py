@@ -4,41 +4,202 @@ FPGA Vizuelizacioni Alat - Glavna aplikacija
 Proces razvoja informacionih sistema 2025
 """
 
+import io
 import os
 import sys
 import re
 import json
+import queue
+import logging
+import logging.handlers
 import time
+import shutil
+import itertools
+import pickle
+import multiprocessing
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+import matplotlib
+matplotlib.use('Agg')  # server crta samo u PNG fajlove, GUI backend nije potreban
+matplotlib.rcParams['agg.path.chunksize'] = 10000  # duge polilinije ruta se rasterizuju u delovima
 import matplotlib.pyplot as plt
 from flask_cors import CORS
-from typing import Dict, List, Optional
-from flask import Flask, render_template, request, jsonify, send_file
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from flask import Flask, Request, current_app, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # orjson je opcion, bez njega jsonify koristi stdlib json
+    HAS_ORJSON = False
 
 # Dodavanje putanje za import modula
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config.settings import settings
+from config.settings import settings, init_directories
 from models.fpga_architecture import FPGAArchitecture
 from models.circuit import Circuit
 from models.routing import RoutingResult
 from parsers.architecture_parser import ArchitectureParser
 from parsers.circuit_parser import CircuitParser
-from parsers.routing_parser import RoutingParser
-from visualization.signal_visualizer import SignalVisualizer
+from parsers.routing_parser import RoutingParser, parse_routing_file_worker
+from visualization.signal_visualizer import SignalVisualizer, render_routing_worker
 from analysis.conflict_graph import ConflictGraphBuilder
 
-# Globalne promenljive za keširane podatke
-cached_routing = None
-cached_architecture = None
-cached_architecture_filename = None
-cached_routing_filename = None
+
+logger = logging.getLogger(__name__)
+
+# Dimenzije niza u zaglavlju .route fajla (traže se samo u prvih 64 KiB)
+ROUTE_HEADER_SCAN_BYTES = 64 * 1024
+ARRAY_SIZE_RE = re.compile(rb'array\s+size:\s+(\d+)\s+x\s+(\d+)')
+
+# Poruke grešaka uploada (ruta može da prosledi svoje)
+UPLOAD_ERRORS = {
+    'missing': 'No file uploaded',
+    'empty': 'No file selected',
+    'extension': 'Unsupported file type',
+}
+
+# Broj parsiranih RoutingResult objekata koji se čuvaju po hešu sadržaja fajla
+ROUTING_CACHE_SIZE = 16
+
+# Broj parsiranih arhitektura koje se čuvaju po hešu sadržaja XML fajla
+ARCHITECTURE_CACHE_SIZE = 8
+
+# Broj generisanih slika rutiranja koje se čuvaju u memoriji za ponovljene zahteve
+VISUALIZATION_CACHE_SIZE = 32
+
+# Koliko sekundi neuspeo posao crtanja čeka da ga klijent preuzme preko /result/<id>
+RENDER_JOB_TTL = 300
+
+# Greške render_pool-a posle kojih se slika crta u niti zahteva
+RENDER_FALLBACK_ERRORS = (BrokenProcessPool, pickle.PicklingError, RecursionError, CancelledError)
+
+# Upload-i do ove veličine ostaju u memoriji (kao Werkzeug podrazumevano),
+# veći se pri parsiranju forme pišu direktno u UPLOAD_FOLDER
+UPLOAD_SPOOL_BYTES = 500 * 1024
+
+if HAS_ORJSON:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider koji odgovore serijalizuje preko orjson-a
+        
+        Postavlja se kao app.json, pa ga svi jsonify(...) pozivi koriste automatski.
+        Ključevi se sortiraju kao kod podrazumevanog providera.
+        """
+        option = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            option = self.option
+            if (self.compact is None and self._app.debug) or self.compact is False:
+                option |= orjson.OPT_INDENT_2
+            try:
+                body = orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                # Tipovi koje orjson ne podržava idu kroz stdlib putanju
+                return super().response(*args, **kwargs)
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+
+@dataclass(slots=True)
+class AppState:
+    """Keširani podaci za vizualizaciju (poslednje učitano rutiranje i arhitektura)"""
+    routing: Optional[RoutingResult] = None
+    architecture: Optional[FPGAArchitecture] = None
+    architecture_filename: Optional[str] = None
+    routing_filename: Optional[str] = None
+    # blake2b heševi sadržaja učitanih fajlova (deo ključa keša slika);
+    # architecture_hash je None za automatski napravljenu arhitekturu
+    routing_hash: Optional[bytes] = None
+    architecture_hash: Optional[bytes] = None
+    # Povećava se pri svakoj promeni rutiranja/arhitekture (deo ključa keša slika)
+    generation: int = 0
+
+
+@dataclass(slots=True)
+class RenderJob:
+    """Posao crtanja u render_pool-u; argumenti ostaju za crtanje u niti ako proces ne uspe"""
+    future: Future
+    architecture: FPGAArchitecture
+    routing: RoutingResult
+    options: Dict
+    # time.monotonic() kada je posao neuspešno završen (za RENDER_JOB_TTL)
+    failed_at: Optional[float] = None
+
+
+def cached_to_dict(obj) -> Dict:
+    """Vraća obj.to_dict(), memoizovan na samom objektu
+    
+    Koristi se za arhitekturu i rutiranje, koji se posle parsiranja ne menjaju;
+    novi upload pravi novi objekat, pa se keš time i poništava.
+    """
+    result = obj.__dict__.get('_cached_dict')
+    if result is None:
+        result = obj.to_dict()
+        obj._cached_dict = result
+    return result
+
+
+def setup_logging(debug: bool) -> logging.handlers.QueueListener:
+    """Podešava logovanje preko reda (QueueHandler + QueueListener)
+    
+    Niti zahteva samo ubacuju zapis u red, a ispis na konzolu radi nit
+    listener-a. Bez DEBUG moda važi settings.LOG_LEVEL, pa se detaljne poruke
+    odbacuju već na proveri nivoa.
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter('%(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, console)
+    
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.DEBUG if debug else settings.LOG_LEVEL)
+    listener.start()
+    return listener
+
+
+class UploadRequest(Request):
+    """Request čiji se veći upload-i tokom parsiranja forme pišu u UPLOAD_FOLDER
+    
+    Werkzeug inače fajl veći od praga drži u anonimnom privremenom fajlu, pa ga
+    _save_upload kopira još jednom. Ovde je privremeni fajl imenovan i na istom
+    disku kao odredište, pa ga _save_upload samo poveže (hard link) bez kopiranja.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        if total_content_length is None or total_content_length <= UPLOAD_SPOOL_BYTES:
+            return super()._get_file_stream(total_content_length, content_type,
+                                            filename, content_length)
+        upload_folder = current_app.config.get('UPLOAD_FOLDER', settings.UPLOAD_FOLDER)
+        os.makedirs(upload_folder, exist_ok=True)
+        return tempfile.NamedTemporaryFile('wb+', dir=upload_folder, prefix='.upload-')
+
+
+class UploadError(ValueError):
+    """Upload odbijen pre snimanja (nema fajla, prazno ime, pogrešna ekstenzija)"""
+
 
 class FPGAVisualizationApp:
     """Glavna klasa FPGA vizuelizacionog alata"""
     
     def __init__(self):
         self.app = Flask(__name__)
+        self.app.request_class = UploadRequest
         self.app.config['UPLOAD_FOLDER'] = settings.UPLOAD_FOLDER
+        self.app.config['MAX_CONTENT_LENGTH'] = settings.MAX_UPLOAD_SIZE
+        # Iza nginx/Apache send_file vraća samo X-Sendfile zaglavlje, a server
+        # šalje fajl; inače WSGI server koristi wsgi.file_wrapper (os.sendfile)
+        self.app.config['USE_X_SENDFILE'] = settings.USE_X_SENDFILE
+        if HAS_ORJSON:
+            self.app.json = OrjsonProvider(self.app)
         
         CORS(self.app)
 
@@ -46,6 +207,20 @@ class FPGAVisualizationApp:
         self.architecture_parser = ArchitectureParser()
         self.circuit_parser = CircuitParser()
         self.routing_parser = RoutingParser()
+        
+        # Parsiranje .route fajlova u zasebnim procesima (van GIL-a niti zahteva);
+        # spawn jer se fork iz procesa sa više niti ne preporučuje
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        if settings.PARSE_WORKERS > 0:
+            self.parse_pool = ProcessPoolExecutor(
+                max_workers=settings.PARSE_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        # Crtanje /api/visualize slika u zasebnim procesima; zahtev odmah vraća
+        # ID posla, a slika se preuzima preko /result/<id>
+        self.render_pool: Optional[ProcessPoolExecutor] = None
+        if settings.RENDER_WORKERS > 0:
+            self.render_pool = self._new_render_pool()
         self.signal_visualizer = SignalVisualizer()
         self.conflict_builder = ConflictGraphBuilder()
         
@@ -58,11 +233,338 @@ class FPGAVisualizationApp:
         self.architecture_filename: Optional[str] = None
         self.routing_filename: Optional[str] = None
         
+        # Keširani podaci za vizualizaciju (ranije globalne promenljive)
+        self.state = AppState()
+        
+        # LRU keš parsiranih .route fajlova: (heš, dimenzije, arhitektura, kolo) -> rezultat
+        self._routing_cache: OrderedDict = OrderedDict()
+        self._routing_cache_lock = threading.Lock()
+        
+        # LRU keš parsiranih arhitektura: heš XML-a -> FPGAArchitecture
+        # (to_dict() rezultat se memoizuje na samom objektu, pa se i on ponovo koristi)
+        self._architecture_cache: OrderedDict = OrderedDict()
+        self._architecture_cache_lock = threading.Lock()
+        
+        # Redni broj za imena izlaznih slika; next() je atomičan, pa dve niti
+        # u istoj sekundi ne dobijaju isto ime
+        self._output_seq = itertools.count()
+        
+        # LRU keš slika iz /api/visualize: ključ zahteva -> PNG bajtovi
+        self._visualization_cache: OrderedDict = OrderedDict()
+        self._visualization_cache_lock = threading.Lock()
+        
+        # Poslovi crtanja u render_pool-u: ID posla (ključ keša slika) -> RenderJob
+        self._render_jobs: Dict[str, RenderJob] = {}
+        self._render_jobs_lock = threading.Lock()
+        
         self._setup_routes()
     
+    def _save_upload(self, file, filepath: str, digest=None) -> int:
+        """Strimuje upload direktno na disk u blokovima i vraća veličinu u bajtovima
+        
+        Fajl se ne učitava ceo u memoriju. Ako je dužina zahteva poznata,
+        prostor se unapred alocira, a višak se odseca posle upisa.
+        Ako je prosleđen hashlib objekat (digest), blokovi se heširaju
+        u istom prolazu, pa fajl kasnije ne mora ponovo da se čita.
+        Upload koji je UploadRequest već upisao na disk se samo poveže.
+        """
+        src = getattr(file.stream, 'name', None)
+        if isinstance(src, str):
+            size = self._link_upload(src, filepath, digest)
+            if size is not None:
+                return size
+        
+        with open(filepath, 'wb') as dst:
+            length = request.content_length
+            if length and hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(dst.fileno(), 0, length)
+                except OSError:
+                    pass
+            if digest is None:
+                shutil.copyfileobj(file.stream, dst, length=settings.UPLOAD_CHUNK_SIZE)
+            else:
+                for chunk in iter(lambda: file.stream.read(settings.UPLOAD_CHUNK_SIZE), b''):
+                    dst.write(chunk)
+                    digest.update(chunk)
+            size = dst.tell()
+            dst.truncate(size)
+        return size
+    
+    def _link_upload(self, src: str, filepath: str, digest=None) -> Optional[int]:
+        """Povezuje (hard link) već snimljen upload na filepath; None ako to nije moguće"""
+        part = f"{filepath}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.link(src, part)
+        except OSError:
+            # npr. drugi fajl sistem (tempfile u /tmp) - _save_upload kopira
+            return None
+        # NamedTemporaryFile je 0600; snimljen upload dobija uobičajena prava
+        os.chmod(part, 0o644)
+        os.replace(part, filepath)
+        
+        if digest is not None:
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+        return os.path.getsize(filepath)
+    
+    def _accept_upload(self, field: str, allowed_exts: Tuple[str, ...] = (),
+                       filepath: Optional[str] = None,
+                       errors: Dict[str, str] = UPLOAD_ERRORS) -> Tuple[str, str, bytes]:
+        """Proverava upload polje, snima fajl i vraća (ime, putanja, blake2b heš sadržaja)
+        
+        Ekstenzija se proverava bez obzira na velika/mala slova. Ako putanja
+        nije zadata, fajl se snima u UPLOAD_FOLDER pod originalnim imenom.
+        Neispravan upload podiže UploadError sa porukom iz errors.
+        """
+        file = request.files.get(field)
+        if file is None:
+            logger.warning("❌ NEMA FAJLA U ZAHTEVU")
+            raise UploadError(errors['missing'])
+        
+        filename = file.filename
+        logger.debug("📄 FAJL: %s", filename)
+        if not filename:
+            logger.warning("❌ PRAZNO IME FAJLA")
+            raise UploadError(errors['empty'])
+        
+        if allowed_exts and not filename.lower().endswith(allowed_exts):
+            logger.warning("❌ POGREŠNA EKSTENZIJA: %s", filename)
+            raise UploadError(errors['extension'])
+        
+        if filepath is None:
+            upload_folder = self.app.config.get('UPLOAD_FOLDER', settings.UPLOAD_FOLDER)
+            os.makedirs(upload_folder, exist_ok=True)
+            filepath = os.path.join(upload_folder, filename)
+        
+        digest = hashlib.blake2b()
+        size = self._save_upload(file, filepath, digest)
+        logger.info("💾 FAJL SAČUVAN: %s (%d bytes)", filepath, size)
+        return filename, filepath, digest.digest()
+    
+    def _circuit_response(self, circuit: Circuit, **fields):
+        """JSON odgovor {'circuit': ..., **fields}; kolo se serijalizuje preko Circuit.to_json_bytes"""
+        if HAS_ORJSON:
+            rest = orjson.dumps(fields, default=self.app.json.default, option=OrjsonProvider.option)
+        else:
+            rest = self.app.json.dumps(fields).encode('utf-8')
+        body = b'{"circuit":' + circuit.to_json_bytes() + (b',' + rest[1:] if fields else b'}')
+        return self.app.response_class(body, mimetype='application/json')
+    
+    def _send_output(self, file_path: str):
+        """Šalje generisani fajl uz ETag/Last-Modified, pa ponovljeni GET dobija 304
+        
+        Keš browsera se uvek revalidira (no-cache) jer se npr.
+        routing_visualization.png prepisuje pod istim imenom.
+        """
+        return send_file(
+            file_path,
+            as_attachment=False,  # za prikaz u browseru
+            conditional=True,
+            etag=True,
+            max_age=None
+        )
+    
+    def _visualization_key(self, selected: frozenset, data: Dict) -> str:
+        """Ključ /api/visualize zahteva (ujedno ID posla i slike)
+        
+        Izvodi se iz heša selekcije, opcija, sadržaja i imena učitanih fajlova
+        i generacije stanja, pa isti zahtev nad istim podacima ponovo koristi
+        već generisanu sliku. Heševi sadržaja čine ključ jedinstvenim i između
+        procesa (generacija posle restarta ponovo kreće od 0), pa browser ne
+        prikazuje keširanu /img/<id> sliku nekog drugog fajla.
+        """
+        state = self.state
+        architecture = state.architecture
+        payload = json.dumps({
+            'signals': sorted(selected),
+            'opts': {k: v for k, v in data.items() if k != 'signals'},
+            'routing': state.routing_hash.hex() if state.routing_hash else None,
+            'architecture': (state.architecture_hash.hex() if state.architecture_hash
+                             else (architecture.width, architecture.height)),
+            'files': (state.architecture_filename, state.routing_filename),
+            'generation': state.generation
+        }, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+    
+    def _cached_png(self, key: str) -> Optional[bytes]:
+        with self._visualization_cache_lock:
+            png = self._visualization_cache.get(key)
+            if png is not None:
+                self._visualization_cache.move_to_end(key)
+            return png
+    
+    def _store_png(self, key: str, png: bytes):
+        """Čuva PNG u memoriji; najstarije slike ispadaju posle VISUALIZATION_CACHE_SIZE"""
+        with self._visualization_cache_lock:
+            self._visualization_cache[key] = png
+            self._visualization_cache.move_to_end(key)
+            while len(self._visualization_cache) > VISUALIZATION_CACHE_SIZE:
+                self._visualization_cache.popitem(last=False)
+    
+    @staticmethod
+    def _new_render_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=settings.RENDER_WORKERS,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    
+    def _render_png(self, architecture: FPGAArchitecture, routing: RoutingResult,
+                    options: Dict) -> bytes:
+        """Crta rutiranje u niti zahteva (deljeni SignalVisualizer) i vraća PNG bajtove"""
+        buffer = io.BytesIO()
+        self.signal_visualizer.visualize_routing(
+            architecture=architecture,
+            routing=routing,
+            output_path=None,
+            output_buffer=buffer,
+            **options
+        )
+        return buffer.getvalue()
+    
+    def _submit_render(self, job_id: str, architecture: FPGAArchitecture,
+                       routing: RoutingResult, options: Dict) -> bool:
+        """Šalje crtanje u render_pool; isti posao koji je još u toku se ne ponavlja
+        
+        Pokvaren pool (umro radni proces) se zamenjuje novim. Vraća False ako
+        posao ni tada ne može da se pošalje, pa pozivalac crta u niti zahteva.
+        """
+        with self._render_jobs_lock:
+            self._prune_render_jobs()
+            job = self._render_jobs.get(job_id)
+            if job is not None and not job.future.done():
+                return True
+            try:
+                future = self.render_pool.submit(
+                    render_routing_worker, architecture, routing, options
+                )
+            except BrokenProcessPool:
+                logger.warning("⚠️ Render pool je pokvaren, pravi se novi")
+                broken, self.render_pool = self.render_pool, self._new_render_pool()
+                broken.shutdown(wait=False, cancel_futures=True)
+                try:
+                    future = self.render_pool.submit(
+                        render_routing_worker, architecture, routing, options
+                    )
+                except BrokenProcessPool as e:
+                    logger.warning("⚠️ Crtanje u procesu nije moguće (%s)", e)
+                    return False
+            self._render_jobs[job_id] = RenderJob(future, architecture, routing, options)
+        # Van lock-a: callback se poziva odmah ako je posao već gotov
+        future.add_done_callback(lambda f, key=job_id: self._render_finished(key, f))
+        return True
+    
+    def _render_finished(self, job_id: str, future: Future):
+        """Gotova slika prelazi u keš; neuspeo posao čeka /result/<id> najviše RENDER_JOB_TTL"""
+        with self._render_jobs_lock:
+            job = self._render_jobs.get(job_id)
+            if job is None or job.future is not future:
+                return
+            if future.cancelled() or future.exception() is not None:
+                job.failed_at = time.monotonic()
+                return
+            self._store_png(job_id, future.result())
+            del self._render_jobs[job_id]
+    
+    def _prune_render_jobs(self):
+        """Izbacuje neuspele poslove koje niko nije preuzeo (poziva se pod _render_jobs_lock)"""
+        deadline = time.monotonic() - RENDER_JOB_TTL
+        for key in [k for k, job in self._render_jobs.items()
+                    if job.failed_at is not None and job.failed_at < deadline]:
+            del self._render_jobs[key]
+    
+    def _parse_architecture_cached(self, filepath: str, content_hash: bytes) -> FPGAArchitecture:
+        """Parsira arhitekturu, a ponovljeni upload istog XML-a vraća iz keša"""
+        key = content_hash
+        with self._architecture_cache_lock:
+            arch = self._architecture_cache.get(key)
+            if arch is not None:
+                self._architecture_cache.move_to_end(key)
+                logger.info("♻️ Arhitektura već parsirana, koristi se keš")
+                return arch
+        
+        # Pokušaj poziva uobičajenih metoda parsera (parse / parse_xml / parse_architecture_file)
+        parser = self.architecture_parser
+        if hasattr(parser, 'parse'):
+            arch = parser.parse(filepath)
+        elif hasattr(parser, 'parse_xml'):
+            arch = parser.parse_xml(filepath)
+        elif hasattr(parser, 'parse_architecture_file'):
+            arch = parser.parse_architecture_file(filepath)
+        else:
+            raise RuntimeError('ArchitectureParser nema podržanu metodu za parsiranje')
+        
+        if arch is not None:
+            with self._architecture_cache_lock:
+                self._architecture_cache[key] = arch
+                self._architecture_cache.move_to_end(key)
+                while len(self._architecture_cache) > ARCHITECTURE_CACHE_SIZE:
+                    self._architecture_cache.popitem(last=False)
+        return arch
+    
+    def _parse_routing_file(self, parser: RoutingParser, filepath: str,
+                            architecture: FPGAArchitecture,
+                            circuit: Optional[Circuit]) -> RoutingResult:
+        """Parsira .route fajl u procesu iz parse_pool-a, ili u niti ako pool nije dostupan"""
+        if self.parse_pool is None:
+            return parser.parse_routing_file(filepath, architecture, circuit)
+        
+        try:
+            result = self.parse_pool.submit(parse_routing_file_worker, filepath).result()
+        except (BrokenProcessPool, pickle.PicklingError, RecursionError) as e:
+            logger.warning("⚠️ Parsiranje u procesu nije uspelo (%s), parsira se u niti zahteva", e)
+            return parser.parse_routing_file(filepath, architecture, circuit)
+        
+        # Arhitektura i kolo se ne šalju procesu, vezuju se za rezultat ovde
+        result.architecture = architecture
+        result.circuit = circuit
+        return result
+    
+    def _parse_routing_cached(self, parser: RoutingParser, filepath: str,
+                              architecture: FPGAArchitecture,
+                              circuit: Optional[Circuit],
+                              content_hash: Optional[bytes] = None) -> RoutingResult:
+        """Parsira .route fajl, a ponovljeni upload istog sadržaja vraća iz keša
+        
+        Ključ je blake2b heš sadržaja uz dimenzije i identitet arhitekture i kola,
+        jer oni utiču na rezultat parsiranja. content_hash je heš već izračunat pri
+        snimanju uploada; ako nije prosleđen, fajl se hešira ovde.
+        """
+        if content_hash is None:
+            digest = hashlib.blake2b()
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(settings.UPLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            content_hash = digest.digest()
+        key = (content_hash, architecture.width, architecture.height,
+               id(architecture), id(circuit))
+        
+        with self._routing_cache_lock:
+            entry = self._routing_cache.get(key)
+            if entry is not None:
+                self._routing_cache.move_to_end(key)
+                logger.info("♻️ Routing fajl već parsiran, koristi se keš")
+                return entry[2]
+        
+        result = self._parse_routing_file(parser, filepath, architecture, circuit)
+        
+        with self._routing_cache_lock:
+            # Čuvaju se i reference na arhitekturu i kolo da bi id() u ključu ostao jedinstven
+            self._routing_cache[key] = (architecture, circuit, result)
+            self._routing_cache.move_to_end(key)
+            while len(self._routing_cache) > ROUTING_CACHE_SIZE:
+                self._routing_cache.popitem(last=False)
+        return result
+    
     def _setup_routes(self):
         """Podešava Flask rute"""
         
+        @self.app.errorhandler(413)
+        def upload_too_large(e):
+            """Zahtev veći od MAX_CONTENT_LENGTH (settings.MAX_UPLOAD_SIZE)"""
+            return jsonify({'success': False, 'error': 'File too large'}), 413
+        
         @self.app.route('/')
         def index():
             return render_template('index.html')
@@ -70,47 +572,29 @@ class FPGAVisualizationApp:
         @self.app.route('/upload/architecture', methods=['POST'])
         def upload_architecture():
             """Ruta za upload FPGA arhitekture"""
-            if 'file' not in request.files:
-                return jsonify({'error': 'No file uploaded'}), 400
-
-            file = request.files['file']
-            if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
-
-            filename = file.filename
-            if not filename.lower().endswith('.xml'):
-                return jsonify({'error': 'Unsupported file type; expected .xml'}), 400
-
-            os.makedirs(self.app.config.get('UPLOAD_FOLDER', settings.UPLOAD_FOLDER), exist_ok=True)
-            filepath = os.path.join(self.app.config.get('UPLOAD_FOLDER', settings.UPLOAD_FOLDER), filename)
-            file.save(filepath)
+            try:
+                filename, filepath, content_hash = self._accept_upload(
+                    'file', ('.xml',), errors={**UPLOAD_ERRORS, 'extension': 'Unsupported file type; expected .xml'})
+            except UploadError as e:
+                return jsonify({'error': str(e)}), 400
 
             try:
-                    # Pokušaj poziva uobičajenih metoda parsera (parse / parse_xml / parse_architecture_file)
-                    parser = self.architecture_parser
-                    arch = None
-                    if hasattr(parser, 'parse'):
-                        arch = parser.parse(filepath)
-                    elif hasattr(parser, 'parse_xml'):
-                        arch = parser.parse_xml(filepath)
-                    elif hasattr(parser, 'parse_architecture_file'):
-                        arch = parser.parse_architecture_file(filepath)
-                    else:
-                        raise RuntimeError('ArchitectureParser nema podržanu metodu za parsiranje')
+                    arch = self._parse_architecture_cached(filepath, content_hash)
 
                     # Očekuje se da parser vrati instancu FPGAArchitecture
                     self.current_architecture = arch
                     self.architecture_filename = filename  # Sačuvaj ime fajla
                     
-                    # Ažuriraj globalne kešove za vizualizaciju
-                    global cached_architecture, cached_architecture_filename
-                    cached_architecture = arch
-                    cached_architecture_filename = filename
+                    # Ažuriraj keš za vizualizaciju
+                    self.state.architecture = arch
+                    self.state.architecture_filename = filename
+                    self.state.architecture_hash = content_hash
+                    self.state.generation += 1
 
                     # Ako objekat ima to_dict, vratiti ga klijentu radi prikaza
                     arch_dict = {}
                     if arch is not None and hasattr(arch, 'to_dict'):
-                        arch_dict = arch.to_dict()
+                        arch_dict = cached_to_dict(arch)
 
                     return jsonify({'success': True, 'architecture': arch_dict})
             except Exception as e:
@@ -124,50 +608,35 @@ class FPGAVisualizationApp:
         @self.app.route('/upload/routing', methods=['POST'])
         def upload_routing():
             """Route for uploading routing results (.route)"""
-            print("=" * 50)
-            print("📥 PRIMLJEN ZAHTEV ZA UPLOAD RUTIRANJA")
-            
-            if 'file' not in request.files:
-                print("❌ NEMA FAJLA U ZAHTEVU")
-                return jsonify({'error': 'No file uploaded'}), 400
-
-            file = request.files['file']
-            print(f"📄 FAJL: {file.filename}")
-            print(f"📊 VELIČINA: {len(file.read()) if file else 0} bytes")
-            file.seek(0)  # Reset file pointer
+            logger.info("📥 PRIMLJEN ZAHTEV ZA UPLOAD RUTIRANJA")
             
-            if file.filename == '':
-                print("❌ PRAZNO IME FAJLA")
-                return jsonify({'error': 'No file selected'}), 400
-                
-            if not file.filename.endswith('.route'):
-                print("❌ POGREŠNA EKSTENZIJA")
-                return jsonify({'error': 'Invalid file type - must be .route'}), 400
-
             try:
-                # Save uploaded file
-                os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
-                filepath = os.path.join(settings.UPLOAD_FOLDER, file.filename)
-                file.save(filepath)
-                print(f"💾 FAJL SAČUVAN: {filepath}")
+                filename, filepath, content_hash = self._accept_upload(
+                    'file', ('.route',),
+                    errors={**UPLOAD_ERRORS, 'extension': 'Invalid file type - must be .route'})
+            except UploadError as e:
+                return jsonify({'error': str(e)}), 400
 
+            try:
                 # Require architecture to be loaded first
                 if not self.current_architecture:
-                    print("❌ NIJE UČITANA ARHITEKTURA")
+                    logger.warning("❌ NIJE UČITANA ARHITEKTURA")
                     return jsonify({'error': 'Upload architecture (.xml) before routing file'}), 400
 
-                print("🔍 POČINJEM PARSIRANJE ROUTING FAJLA...")
+                logger.debug("🔍 POČINJEM PARSIRANJE ROUTING FAJLA...")
                 # Parse routing file
-                self.current_routing = self.routing_parser.parse_routing_file(
+                self.current_routing = self._parse_routing_cached(
+                    self.routing_parser,
                     filepath,
                     self.current_architecture,
-                    self.current_circuit  # Optional
+                    self.current_circuit,  # Optional
+                    content_hash
                 )
-                self.routing_filename = file.filename  # Sačuvaj ime fajla
-                print("✅ ROUTING USPEŠNO PARSIRAN")
+                self.routing_filename = filename  # Sačuvaj ime fajla
+                logger.info("✅ ROUTING USPEŠNO PARSIRAN")
 
-                routing_dict = self.current_routing.to_dict() if self.current_routing else {}
-                print(f"📊 BROJ RUTA: {len(routing_dict.get('routes', []))}")
+                routing_dict = cached_to_dict(self.current_routing) if self.current_routing else {}
+                logger.debug("📊 BROJ RUTA: %d", len(routing_dict.get('routes', [])))
 
                 return jsonify({
                     'success': True,
@@ -175,7 +644,7 @@ class FPGAVisualizationApp:
                 })
 
             except Exception as e:
-                print(f"💥 GREŠKA PRI PARSIRANJU: {str(e)}")
+                logger.error("💥 GREŠKA PRI PARSIRANJU: %s", e)
                 import traceback
                 traceback.print_exc()
                 return jsonify({'error': str(e)}), 400
@@ -183,67 +652,79 @@ class FPGAVisualizationApp:
         @self.app.route('/api/parse_routing', methods=['POST'])
         def parse_routing():
             """Parse .route fajl i vrati listu signala"""
-            global cached_routing, cached_architecture, cached_routing_filename, cached_architecture_filename
             
             try:
-                if 'routing_file' not in request.files:
-                    return jsonify({'success': False, 'error': 'Nema fajla'}), 400
-                
-                file = request.files['routing_file']
-                if file.filename == '':
-                    return jsonify({'success': False, 'error': 'Prazan fajl'}), 400
-                
                 import tempfile
                 
                 with tempfile.NamedTemporaryFile(delete=False, suffix='.route') as tmp:
-                    file.save(tmp.name)
                     tmp_path = tmp.name
+                try:
+                    filename, _, content_hash = self._accept_upload(
+                        'routing_file', filepath=tmp_path,
+                        errors={'missing': 'Nema fajla', 'empty': 'Prazan fajl'})
+                except UploadError as e:
+                    os.unlink(tmp_path)
+                    return jsonify({'success': False, 'error': str(e)}), 400
                 
                 try:
                     width, height = 4, 4  # Default
             
-                    with open(tmp_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            # Traži: "Array size: 10 x 10 logic blocks"
-                            match = re.search(r'Array\s+size:\s+(\d+)\s+x\s+(\d+)', line, re.IGNORECASE)
-                            if match:
-                                width = int(match.group(1))
-                                height = int(match.group(2))
-                                print(f"✅ Pročitane dimenzije iz .route: {width}×{height}")
-                                break
+                    # Traži: "Array size: 10 x 10 logic blocks" u zaglavlju fajla;
+                    # bytes.find (memchr) nalazi kandidate, regex se proverava samo na njima
+                    with open(tmp_path, 'rb') as f:
+                        head = f.read(ROUTE_HEADER_SCAN_BYTES).lower()
+                    idx = head.find(b'array')
+                    while idx != -1:
+                        match = ARRAY_SIZE_RE.match(head, idx)
+                        if match:
+                            width = int(match.group(1))
+                            height = int(match.group(2))
+                            logger.debug("✅ Pročitane dimenzije iz .route: %d×%d", width, height)
+                            break
+                        idx = head.find(b'array', idx + 1)
                     
                     parser = RoutingParser()
                     
                     # KREIRAJ ARHITEKTURU SA PRAVIM DIMENZIJAMA
                     # Ako arhitektura ne postoji ili dimenzije ne odgovaraju
-                    if cached_architecture is None or \
-                    cached_architecture.width != width or \
-                    cached_architecture.height != height:
+                    if self.state.architecture is None or \
+                    self.state.architecture.width != width or \
+                    self.state.architecture.height != height:
                         from models.fpga_architecture import FPGAArchitecture
-                        cached_architecture = FPGAArchitecture(width=width, height=height)
+                        self.state.architecture = FPGAArchitecture(width=width, height=height)
+                        self.state.architecture_hash = None
                         # Samo postavi auto-generated ime ako nije bilo ručno učitane arhitekture
-                        if cached_architecture_filename is None or cached_architecture_filename.startswith("Auto-generated"):
-                            cached_architecture_filename = f"Auto-generated {width}x{height}"
-                        print(f"🏗️ Kreirana arhitektura: {width}×{height}")
+                        if self.state.architecture_filename is None or self.state.architecture_filename.startswith("Auto-generated"):
+                            self.state.architecture_filename = f"Auto-generated {width}x{height}"
+                        logger.info("🏗️ Kreirana arhitektura: %d×%d", width, height)
                     
-                    routing_result = parser.parse_routing_file(
-                        tmp_path, 
-                        architecture=cached_architecture,
-                        circuit=None
+                    routing_result = self._parse_routing_cached(
+                        parser,
+                        tmp_path,
+                        architecture=self.state.architecture,
+                        circuit=None,
+                        content_hash=content_hash
                     )
                     
                     # KEŠIRANJE
-                    cached_routing = routing_result
-                    cached_routing_filename = file.filename
+                    self.state.routing = routing_result
+                    self.state.routing_filename = filename
+                    self.state.routing_hash = content_hash
+                    self.state.generation += 1
                     
-                    # Izvuci signale
-                    signals = []
-                    for route in routing_result.routes:
-                        signals.append({
-                            'net_name': route.net_name,
-                            'segment_count': len(route.segments),
-                            'fanout': len(route.get_all_source_to_sink_paths()) if route.root else 1
-                        })
+                    # Izvuci signale (lista se pamti na rezultatu, pa ponovljeni
+                    # upload istog fajla iz keša ne prolazi ponovo kroz rute)
+                    signals = routing_result.__dict__.get('_signal_summary')
+                    if signals is None:
+                        signals = [
+                            {
+                                'net_name': route.net_name,
+                                'segment_count': len(route.segments),
+                                'fanout': route.fanout if route.root else 1
+                            }
+                            for route in routing_result.routes
+                        ]
+                        routing_result._signal_summary = signals
                     
                     return jsonify({
                         'success': True,
@@ -266,53 +747,32 @@ class FPGAVisualizationApp:
         @self.app.route('/upload/circuit', methods=['POST'])
         def upload_circuit():
             """Ruta za upload kola"""
-            print("=" * 50)
-            print("📥 PRIMLJEN ZAHTEV ZA UPLOAD KOLA")
-            
-            if 'file' not in request.files:
-                print("❌ NEMA FAJLA U ZAHTEVU")
-                return jsonify({'error': 'No file uploaded'}), 400
-            
-            file = request.files['file']
-            print(f"📄 FAJL: {file.filename}")
-            print(f"📊 VELIČINA: {len(file.read()) if file else 0} bytes")
-            
-            # Vrati se na početak fajla
-            file.seek(0)
-            
-            if file.filename == '':
-                print("❌ PRAZNO IME FAJLA")
-                return jsonify({'error': 'No file selected'}), 400
+            logger.info("📥 PRIMLJEN ZAHTEV ZA UPLOAD KOLA")
             
-            # Kreiraj uploads folder ako ne postoji
-            os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
-            filepath = os.path.join(settings.UPLOAD_FOLDER, file.filename)
+            try:
+                filename, filepath, _ = self._accept_upload(
+                    'file', ('.v', '.blif'),
+                    errors={**UPLOAD_ERRORS, 'extension': 'Unsupported file format. Use .v or .blif'})
+            except UploadError as e:
+                return jsonify({'error': str(e)}), 400
             
             try:
-                file.save(filepath)
-                print(f"💾 FAJL SAČUVAN: {filepath}")
-                
-                if file.filename.endswith('.v'):
-                    print("🔧 PARSIRAM VERILOG...")
+                if filename.lower().endswith('.v'):
+                    logger.debug("🔧 PARSIRAM VERILOG...")
                     self.current_circuit = self.circuit_parser.parse_verilog(filepath)
-                elif file.filename.endswith('.blif'):
-                    print("🔧 PARSIRAM BLIF...")
-                    self.current_circuit = self.circuit_parser.parse_blif(filepath)
                 else:
-                    print("❌ NEPODRŽAN FORMAT")
-                    return jsonify({'error': 'Unsupported file format. Use .v or .blif'}), 400
+                    logger.debug("🔧 PARSIRAM BLIF...")
+                    self.current_circuit = self.circuit_parser.parse_blif(filepath)
                 
-                print(f"✅ KOLO PARSIRANO: {self.current_circuit.name}")
-                print(f"📈 SIGNALI: {len(self.current_circuit.signals)}")
-                print(f"🔧 KOMPONENTE: {len(self.current_circuit.components)}")
+                logger.info("✅ KOLO PARSIRANO: %s (signali: %d, komponente: %d)",
+                            self.current_circuit.name,
+                            len(self.current_circuit.signals),
+                            len(self.current_circuit.components))
                 
-                return jsonify({
-                    'success': True,
-                    'circuit': self.current_circuit.to_dict()
-                })
+                return self._circuit_response(self.current_circuit, success=True)
                 
             except Exception as e:
-                print(f"💥 GREŠKA PRI PARSIRANJU: {e}")
+                logger.error("💥 GREŠKA PRI PARSIRANJU: %s", e)
                 import traceback
                 traceback.print_exc()
                 return jsonify({'error': str(e)}), 400
@@ -320,13 +780,12 @@ class FPGAVisualizationApp:
         @self.app.route('/api/visualize', methods=['POST'])
         def visualize_selected_signals():
             """Vizuelizuj samo selektovane signale"""
-            global cached_routing, cached_architecture, cached_architecture_filename, cached_routing_filename
             
             try:
-                if cached_routing is None:
+                if self.state.routing is None:
                     return jsonify({'success': False, 'error': 'Prvo učitaj .route fajl'}), 400
                 
-                if cached_architecture is None:
+                if self.state.architecture is None:
                     return jsonify({'success': False, 'error': 'Prvo učitaj arhitekturu'}), 400
                 
                 data = request.get_json()
@@ -344,53 +803,49 @@ class FPGAVisualizationApp:
                 filter_type = data.get('filter_type', None)
                 filter_value = data.get('filter_value', None)
                 
-                print("=" * 60)
-                print("📊 VISUALIZATION REQUEST")
-                print(f"Selected signals: {selected_signals}")
-                print(f"Total cached routes: {len(cached_routing.routes)}")
-                print("=" * 60)
+                logger.info("📊 VISUALIZATION REQUEST")
+                logger.debug("Selected signals: %s", selected_signals)
+                logger.debug("Total cached routes: %d", len(self.state.routing.routes))
                 
                 if not selected_signals:
                     return jsonify({'success': False, 'error': 'Nema selektovanih signala'}), 400
                 
-                # Filtriraj rute
+                # Filtriraj rute (skup za O(1) proveru, redosled ruta ostaje isti)
+                selected_set = frozenset(selected_signals)
                 filtered_routes = [
-                    route for route in cached_routing.routes 
-                    if route.net_name in selected_signals
+                    route for route in self.state.routing.routes 
+                    if route.net_name in selected_set
                 ]
                 
-                print(f"Filtered routes: {len(filtered_routes)}")
-                for route in filtered_routes:
-                    print(f"  - {route.net_name}")
+                logger.debug("Filtered routes: %d", len(filtered_routes))
+                if logger.isEnabledFor(logging.DEBUG):
+                    for route in filtered_routes:
+                        logger.debug("  - %s", route.net_name)
                 
                 if not filtered_routes:
                     return jsonify({'success': False, 'error': 'Selektovani signali ne postoje'}), 400
                 
-                # Kreiraj filtrirani routing
-                filtered_routing = RoutingResult(
-                    routes=filtered_routes,
-                    congestion=cached_routing.congestion,
-                    architecture=cached_architecture,
-                    circuit=cached_routing.circuit,
-                    successful=True
-                )
-                
-                # Vizuelizacija
-                visualizer = SignalVisualizer()
-                
-                # VAŽNO: Pravilna putanja
-                output_filename = 'routing_visualization.png'
-                output_path = os.path.join(settings.OUTPUT_FOLDER, output_filename)
-                
-                # Kreiraj folder ako ne postoji
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                # Ključ zavisi od selekcije i opcija; slika se servira preko /img/<id>
+                job_id = self._visualization_key(selected_set, data)
+                response = {
+                    'success': True,
+                    'job_id': job_id,
+                    'result_url': f'/result/{job_id}',
+                    'image_url': f'/img/{job_id}',
+                    'signals_visualized': len(filtered_routes)
+                }
                 
-                print(f"📁 Čuvam sliku na: {output_path}")
+                if self._cached_png(job_id) is not None:
+                    logger.debug("♻️ Ista vizuelizacija već postoji: %s", job_id)
+                    return jsonify(response)
                 
-                visualizer.visualize_routing(
-                    architecture=cached_architecture,
-                    routing=filtered_routing,
-                    output_path=output_path,
+                # Filtrirani routing deli zagušenje i kolo sa keširanim (bez kopiranja)
+                filtered_routing = self.state.routing.with_routes(
+                    filtered_routes,
+                    architecture=self.state.architecture,
+                    successful=True
+                )
+                render_options = dict(
                     show_grid=show_grid,
                     show_signals=show_signals,
                     show_directions=show_directions,
@@ -399,32 +854,75 @@ class FPGAVisualizationApp:
                     show_signal_labels=show_signal_labels,
                     show_heatmap=show_heatmap,
                     show_legend=True,
-                    architecture_file=cached_architecture_filename,
-                    routing_file=cached_routing_filename,
+                    architecture_file=self.state.architecture_filename,
+                    routing_file=self.state.routing_filename,
                     filter_type=filter_type,
                     filter_value=filter_value
                 )
+                if self.render_pool is not None and self._submit_render(
+                        job_id, self.state.architecture, filtered_routing, render_options):
+                    # Nit zahteva se odmah oslobađa; klijent prati /result/<id>
+                    logger.info("🕒 Crtanje poslato u radni proces: %s", job_id)
+                    return jsonify(response), 202
                 
-                # PROVERA: Da li fajl postoji?
-                if not os.path.exists(output_path):
-                    print(f"❌ GREŠKA: Fajl nije kreiran!")
-                    return jsonify({'success': False, 'error': 'Slika nije generisana'}), 500
+                # Vizuelizacija u niti zahteva (deljena instanca, figura se ponovo koristi)
+                self._store_png(job_id, self._render_png(
+                    self.state.architecture, filtered_routing, render_options))
                 
-                print(f"✅ Slika uspešno kreirana: {os.path.getsize(output_path)} bytes")
-                print("=" * 60)
-                
-                # VAŽNO: Vrati samo filename, ne celu putanju
-                return jsonify({
-                    'success': True,
-                    'image_path': output_filename,  # Samo ime fajla
-                    'signals_visualized': len(filtered_routes)
-                })
+                logger.info("✅ Slika uspešno kreirana: %s", job_id)
+                return jsonify(response)
             
             except Exception as e:
                 import traceback
                 traceback.print_exc()
                 return jsonify({'success': False, 'error': str(e)}), 500
             
+        @self.app.route('/result/<job_id>', methods=['GET'])
+        def render_result(job_id):
+            """Stanje posla iz /api/visualize; 202 dok se crtanje ne završi"""
+            with self._render_jobs_lock:
+                job = self._render_jobs.get(job_id)
+            if job is not None:
+                future = job.future
+                if not future.done():
+                    return jsonify({'success': True, 'done': False}), 202
+                error = CancelledError() if future.cancelled() else future.exception()
+                with self._render_jobs_lock:
+                    if self._render_jobs.get(job_id) is job:
+                        del self._render_jobs[job_id]
+                if isinstance(error, RENDER_FALLBACK_ERRORS):
+                    # Proces nije mogao da nacrta (pickle, umro proces); crta se ovde
+                    logger.warning("⚠️ Crtanje u procesu nije uspelo (%r), crta se u niti zahteva", error)
+                    try:
+                        self._store_png(job_id, self._render_png(
+                            job.architecture, job.routing, job.options))
+                    except Exception as e:
+                        logger.error("💥 Crtanje nije uspelo (%s): %s", job_id, e)
+                        return jsonify({'success': False, 'error': str(e)}), 500
+                elif error is not None:
+                    logger.error("💥 Crtanje nije uspelo (%s): %s", job_id, error)
+                    return jsonify({'success': False, 'error': str(error)}), 500
+                else:
+                    self._store_png(job_id, future.result())
+            
+            if self._cached_png(job_id) is None:
+                return jsonify({'success': False, 'error': 'Nepoznat posao'}), 404
+            return jsonify({'success': True, 'done': True, 'image_url': f'/img/{job_id}'})
+        
+        @self.app.route('/img/<job_id>', methods=['GET'])
+        def rendered_image(job_id):
+            """PNG iz memorijskog keša (bez upisa u OUTPUT folder)"""
+            png = self._cached_png(job_id)
+            if png is None:
+                return jsonify({'success': False, 'error': 'Slika nije u kešu'}), 404
+            return send_file(
+                io.BytesIO(png),
+                mimetype='image/png',
+                conditional=True,
+                etag=job_id,
+                max_age=300
+            )
+        
         @self.app.route('/visualize/signals', methods=['POST'])
         def visualize_signals():
             """Endpoint za vizuelizaciju rutiranja (sliku čuva u OUTPUT folder)"""
@@ -444,7 +942,7 @@ class FPGAVisualizationApp:
 
                 # filename i apsolutna putanja
                 ts = int(time.time())
-                filename = f"routing_visualization_{ts}.png"
+                filename = f"routing_visualization_{ts}_{next(self._output_seq)}.png"
                 abs_path = os.path.join(output_folder, filename)
 
                 # generiši sliku
@@ -474,20 +972,20 @@ class FPGAVisualizationApp:
         @self.app.route('/analysis/conflicts', methods=['POST'])
         def analyze_conflicts():
             """Ruta za analizu konflikata - radi sa routing ili circuit podacima"""
-            global cached_routing
             
             data = request.get_json(silent=True) or {}
             selected_signals = data.get('selected_signals', [])
             
-            if cached_routing:
+            if self.state.routing:
                 try:
                     if selected_signals:
+                        selected_set = frozenset(selected_signals)
                         filtered_routing = RoutingResult(
-                            routes=[route for route in cached_routing.routes 
-                                   if route.net_name in selected_signals]
+                            routes=[route for route in self.state.routing.routes 
+                                   if route.net_name in selected_set]
                         )
                     else:
-                        filtered_routing = cached_routing
+                        filtered_routing = self.state.routing
                     
                     if not filtered_routing.routes:
                         return jsonify({'error': 'Nema selektovanih signala za analizu'}), 400
@@ -500,7 +998,7 @@ class FPGAVisualizationApp:
                     os.makedirs(settings.OUTPUT_FOLDER, exist_ok=True)
                     
                     ts = int(time.time())
-                    filename = f'conflict_graph_{ts}.png'
+                    filename = f'conflict_graph_{ts}_{next(self._output_seq)}.png'
                     conflict_viz_path = os.path.join(settings.OUTPUT_FOLDER, filename)
                     fig.savefig(conflict_viz_path, bbox_inches='tight', dpi=150)
                     plt.close(fig)
@@ -529,7 +1027,7 @@ class FPGAVisualizationApp:
                     os.makedirs(settings.OUTPUT_FOLDER, exist_ok=True)
                     
                     ts = int(time.time())
-                    filename = f'conflict_graph_{ts}.png'
+                    filename = f'conflict_graph_{ts}_{next(self._output_seq)}.png'
                     conflict_viz_path = os.path.join(settings.OUTPUT_FOLDER, filename)
                     fig.savefig(conflict_viz_path, bbox_inches='tight', dpi=150)
                     plt.close(fig)
@@ -578,12 +1076,12 @@ class FPGAVisualizationApp:
                 # Kreiranje demo kola
                 self.current_circuit = self.circuit_parser.create_test_circuit(14)
                 
-                return jsonify({
-                    'success': True,
-                    'message': 'Demo data created successfully',
-                    'architecture': self.current_architecture.to_dict(),
-                    'circuit': self.current_circuit.to_dict()
-                })
+                return self._circuit_response(
+                    self.current_circuit,
+                    success=True,
+                    message='Demo data created successfully',
+                    architecture=cached_to_dict(self.current_architecture)
+                )
                 
             except Exception as e:
                 return jsonify({'error': str(e)}), 400
@@ -598,7 +1096,7 @@ class FPGAVisualizationApp:
             
                 file_path = os.path.join(settings.OUTPUT_FOLDER, filename)
                 if os.path.exists(file_path):
-                    return send_file(file_path, as_attachment=False)  # as_attachment=False za prikaz u browseru
+                    return self._send_output(file_path)
                 else:
                     return jsonify({'error': 'File not found'}), 404
             except Exception as e:
@@ -610,7 +1108,7 @@ class FPGAVisualizationApp:
             try:
                 file_path = os.path.join(settings.OUTPUT_FOLDER, filename)
                 if os.path.exists(file_path):
-                    return send_file(file_path)
+                    return self._send_output(file_path)
                 else:
                     return jsonify({'error': 'File not found'}), 404
             except Exception as e:
@@ -680,16 +1178,23 @@ class FPGAVisualizationApp:
         port = port or settings.PORT
         debug = debug or settings.DEBUG
         
-        print(f"Starting FPGA Visualization Tool...")
-        print(f"Server running on http://{host}:{port}")
-        print(f"Debug mode: {debug}")
+        # Kreiranje output i upload direktorijuma ako ne postoje
+        init_directories()
+        
+        listener = setup_logging(debug)
         
-        # Kreiranje output direktorijuma ako ne postoji
-        os.makedirs(settings.OUTPUT_FOLDER, exist_ok=True)
-        os.makedirs(settings.UPLOAD_FOLDER, exist_ok=True)
+        logger.info("Starting FPGA Visualization Tool...")
+        logger.info("Server running on http://%s:%s", host, port)
+        logger.info("Debug mode: %s", debug)
         
-        print(f"📁 Output folder: {os.path.abspath(settings.OUTPUT_FOLDER)}")
-        print(f"📁 Upload folder: {os.path.abspath(settings.UPLOAD_FOLDER)}")
+        # Pokreni radni proces za parsiranje unapred, da prvi upload ne čeka spawn
+        if self.parse_pool is not None:
+            self.parse_pool.submit(int)
+        if self.render_pool is not None:
+            self.render_pool.submit(int)
+        
+        logger.info("📁 Output folder: %s", os.path.abspath(settings.OUTPUT_FOLDER))
+        logger.info("📁 Upload folder: %s", os.path.abspath(settings.UPLOAD_FOLDER))
         
         # Proveri permissions
         try:
@@ -697,18 +1202,26 @@ class FPGAVisualizationApp:
             with open(test_file, 'w') as f:
                 f.write('test')
             os.remove(test_file)
-            print("✅ Output folder je upisiv")
+            logger.info("✅ Output folder je upisiv")
         except Exception as e:
-            print(f"❌ Problem sa output folderom: {e}")
+            logger.error("❌ Problem sa output folderom: %s", e)
         
         # Ispis svih registrovanih ruta
-        print("\n📋 Registrovane rute:")
-        for rule in self.app.url_map.iter_rules():
-            methods = ', '.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))
-            print(f"  {rule.endpoint:30s} {methods:20s} {rule.rule}")
-        print()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📋 Registrovane rute:")
+            for rule in self.app.url_map.iter_rules():
+                methods = ', '.join(sorted(rule.methods - {'HEAD', 'OPTIONS'}))
+                logger.debug("  %-30s %-20s %s", rule.endpoint, methods, rule.rule)
         
-        self.app.run(host=host, port=port, debug=debug)
+        # Svaki zahtev u svojoj niti - upload/parsiranje ne blokira ostale zahteve
+        try:
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
+        finally:
+            if self.parse_pool is not None:
+                self.parse_pool.shutdown(cancel_futures=True)
+            if self.render_pool is not None:
+                self.render_pool.shutdown(cancel_futures=True)
+            listener.stop()
 
 def main():
     """Glavna funkcija za pokretanje aplikacije"""
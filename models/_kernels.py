@@ -0,0 +1,103 @@
+"""
+Numba kerneli za modele (opciono).
+
+Modul se uvozi lenjo, tek kada se računaju dužine/bounding box-ovi pakovanih
+ruta ili traže sledeći čvorovi routing stabla, jer kompajliranje/učitavanje
+keša kernela traje. Ako numba nije
+instalirana, HAS_NUMBA je False i pozivaoci koriste NumPy putanju.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:  # numba je opciona
+    HAS_NUMBA = False
+
+
+if HAS_NUMBA:
+    @njit(
+        "void(int32[:], int32[:], int32[:], float64[:], int32[:, :])",
+        cache=True,
+        nogil=True,
+        parallel=True,
+    )
+    def bulk_length_bbox(xs, ys, offsets, out_len, out_bbox):
+        """Dužina i bounding box svakog signala iz CSR nizova ruta (Circuit.pack).
+
+        Tačke signala i su xs/ys[offsets[i]:offsets[i + 1]]. U out_len[i] se
+        upisuje zbir euklidskih dužina segmenata, a u out_bbox[i] redom
+        (min_x, min_y, max_x, max_y); signal bez tačaka dobija 0 i (0, 0, 0, 0).
+        """
+        for i in prange(offsets.size - 1):
+            start = offsets[i]
+            end = offsets[i + 1]
+            if start == end:
+                out_len[i] = 0.0
+                out_bbox[i, 0] = 0
+                out_bbox[i, 1] = 0
+                out_bbox[i, 2] = 0
+                out_bbox[i, 3] = 0
+                continue
+            min_x = max_x = xs[start]
+            min_y = max_y = ys[start]
+            length = 0.0
+            for k in range(start + 1, end):
+                x = xs[k]
+                y = ys[k]
+                dx = float(x - xs[k - 1])
+                dy = float(y - ys[k - 1])
+                # segmenti paralelni osama (CHANX/CHANY) ne traže koren
+                if dx == 0.0:
+                    length += abs(dy)
+                elif dy == 0.0:
+                    length += abs(dx)
+                else:
+                    length += (dx * dx + dy * dy) ** 0.5
+                if x < min_x:
+                    min_x = x
+                elif x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                elif y > max_y:
+                    max_y = y
+            out_len[i] = length
+            out_bbox[i, 0] = min_x
+            out_bbox[i, 1] = min_y
+            out_bbox[i, 2] = max_x
+            out_bbox[i, 3] = max_y
+
+
+if HAS_NUMBA:
+    @njit(
+        "void(int8[:], int32[:], int32[:], int64, int64, int64, boolean[:])",
+        cache=True,
+        nogil=True,
+    )
+    def next_node_mask(types, xs, ys, current_type, cx, cy, out):
+        """Kandidati za sledeći čvor routing stabla (NetRoute._find_next_nodes)
+        
+        Tipovi su kodovi iz models.routing.NODE_TYPE_CODES (SOURCE=0, OPIN=1,
+        CHANX=2, CHANY=3, IPIN=4, SINK=5). out[i] je True ako čvor i može
+        da sledi trenutni čvor tipa current_type na (cx, cy); pravila su ista
+        kao u _NEXT_NODE_MASKS, ali u jednom prolazu bez privremenih nizova.
+        """
+        for i in range(types.size):
+            t = types[i]
+            dx = xs[i] - cx
+            dy = ys[i] - cy
+            adjacent = abs(dx) <= 1 and abs(dy) <= 1
+            if current_type == 0:
+                out[i] = t == 1 and dx == 0 and dy == 0
+            elif current_type == 1:
+                out[i] = (t == 2 or t == 3) and adjacent
+            elif current_type == 2:
+                out[i] = (((t == 3 or t == 4) and adjacent)
+                          or (t == 2 and dy == 0 and abs(dx) == 1))
+            elif current_type == 3:
+                out[i] = (((t == 2 or t == 4) and adjacent)
+                          or (t == 3 and dx == 0 and abs(dy) == 1))
+            elif current_type == 4:
+                out[i] = t == 5 and dx == 0 and dy == 0
+            else:
+                out[i] = False
@@ -1,9 +1,36 @@
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from .fpga_architecture import Point, BoundingBox
-import math
+import json
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:  # orjson je opcion, bez njega to_json_bytes koristi stdlib json
+    HAS_ORJSON = False
+
+
+def _route_coords(route: List[Point]) -> np.ndarray:
+    """Koordinate tačaka rute kao (N, 2) float64 niz"""
+    coords = np.fromiter((c for p in route for c in (p.x, p.y)),
+                         dtype=np.float64, count=2 * len(route))
+    return coords.reshape(-1, 2)
+
+
+def _segment_lengths(d: np.ndarray) -> np.ndarray:
+    """Euklidske dužine segmenata iz (N, 2) razlika koordinata
+    
+    CHANX/CHANY rute su paralelne osama, pa je tada dužina |dx| + |dy|
+    (isti rezultat kao sqrt za celobrojne koordinate, bez korenovanja).
+    """
+    dx, dy = d[:, 0], d[:, 1]
+    if ((dx == 0) | (dy == 0)).all():
+        return np.abs(dx) + np.abs(dy)
+    return np.sqrt(dx * dx + dy * dy)
+
+
+@dataclass(slots=True)
 class Signal:
     name: str
     source: Optional[Point] = None
@@ -11,75 +38,176 @@ class Signal:
     route: List[Point] = field(default_factory=list)
     length: float = 0.0
     is_excluded: bool = False
+    metadata: Dict = field(default_factory=dict)
+    # Keš izvedenih vrednosti, važi dok je ruta (lista ili lenji niz) isti objekat iste
+    # dužine: dodela nove liste i append ga poništavaju; za izmenu tačaka u mestu videti invalidate_cache()
+    _length_cache: Optional[Tuple[object, int, float]] = field(default=None, init=False, repr=False, compare=False)
+    _bbox_cache: Optional[Tuple[object, int, Tuple[int, int, int, int]]] = field(default=None, init=False, repr=False, compare=False)
+    # (N, 2) int32 koordinate rute učitane iz from_dict; dok je postavljeno,
+    # slot route je prazan i Point objekti se prave tek pri prvom pristupu
+    _coords: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __getattr__(self, name: str):
+        # poziva se samo kada slot nije postavljen (lenja ruta iz from_dict)
+        if name == 'route' and self._coords is not None:
+            route = [Point(x, y) for x, y in self._coords.tolist()]
+            self.route = route
+            self._coords = None
+            return route
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def route_coords(self) -> np.ndarray:
+        """Koordinate rute kao (N, 2) niz, bez pravljenja Point objekata za lenju rutu"""
+        if self._coords is not None:
+            return self._coords
+        return _route_coords(self.route)
+    
+    def _route_source(self):
+        """Objekat koji nosi rutu: lenji niz koordinata ili lista Point objekata"""
+        return self._coords if self._coords is not None else self.route
+    
+    def point_count(self) -> int:
+        """Broj tačaka rute (lenja ruta se ne pretvara u Point objekte)"""
+        return len(self._route_source())
+    
+    def to_dict(self) -> Dict:
+        """Konvertuje signal u dictionary za JSON serijalizaciju"""
+        if self._coords is not None:
+            route = [{'x': x, 'y': y} for x, y in self._coords.tolist()]
+        else:
+            route = [{'x': p.x, 'y': p.y} for p in self.route]
+        return {
+            'name': self.name,
+            'source': {'x': self.source.x, 'y': self.source.y} if self.source else None,
+            'destination': {'x': self.destination.x, 'y': self.destination.y} if self.destination else None,
+            'route': route,
+            'length': self.length,
+            'is_excluded': self.is_excluded
+        }
+    
+    def _cache_hit(self, cache: Optional[tuple]) -> bool:
+        source = self._route_source()
+        return cache is not None and cache[0] is source and cache[1] == len(source)
+    
+    def invalidate_cache(self):
+        """Briše keširanu dužinu i bounding box (posle izmene tačaka rute u mestu)"""
+        self._length_cache = None
+        self._bbox_cache = None
     
     def calculate_length(self) -> float:
         """Računa dužinu signala na osnovu rute"""
-        if len(self.route) < 2:
+        source = self._route_source()
+        if len(source) < 2:
             return 0.0
         
-        total_length = 0.0
-        for i in range(len(self.route) - 1):
-            p1 = self.route[i]
-            p2 = self.route[i + 1]
-            total_length += math.sqrt((p2.x - p1.x)**2 + (p2.y - p1.y)**2)
+        if self._cache_hit(self._length_cache):
+            total_length = self._length_cache[2]
+        else:
+            d = np.diff(self.route_coords().astype(np.float64, copy=False), axis=0)
+            total_length = float(_segment_lengths(d).sum())
+            self._length_cache = (source, len(source), total_length)
         
         self.length = total_length
         return total_length
     
     def get_bounding_box(self) -> BoundingBox:
         """Vraća bounding box signala"""
-        if not self.route:
-            return BoundingBox(0, 0, 0, 0)
+        source = self._route_source()
+        if not len(source):
+            return BoundingBox(Point(0, 0), Point(0, 0))
         
-        xs = [p.x for p in self.route]
-        ys = [p.y for p in self.route]
+        if self._cache_hit(self._bbox_cache):
+            min_x, min_y, max_x, max_y = self._bbox_cache[2]
+        else:
+            if self._coords is not None:
+                (min_x, min_y), (max_x, max_y) = source.min(axis=0).tolist(), source.max(axis=0).tolist()
+            else:
+                xs = [p.x for p in source]
+                ys = [p.y for p in source]
+                min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
+            self._bbox_cache = (source, len(source), (min_x, min_y, max_x, max_y))
         
+        # BoundingBox i Point su promenljivi, pa se svaki put vraća nova instanca
         return BoundingBox(
-            min_x=min(xs),
-            min_y=min(ys),
-            max_x=max(xs),
-            max_y=max(ys)
+            Point(min_x, min_y),
+            Point(max_x, max_y)
         )
 
-@dataclass
+@dataclass(slots=True)
 class Component:
     name: str
     type: str
     position: Point
     inputs: List[str] = field(default_factory=list)
     outputs: List[str] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict:
+        """Konvertuje komponentu u dictionary za JSON serijalizaciju"""
+        return {
+            'name': self.name,
+            'type': self.type,
+            'position': {'x': self.position.x, 'y': self.position.y},
+            'inputs': self.inputs,
+            'outputs': self.outputs
+        }
 
-@dataclass
+@dataclass(slots=True)
 class Circuit:
     name: str
     signals: List[Signal] = field(default_factory=list)
     components: List[Component] = field(default_factory=list)
+    # Rute u SoA obliku (CSR), popunjava ih pack(); tačke i-tog pakovanog
+    # signala su route_xs/route_ys[route_offsets[i]:route_offsets[i + 1]]
+    route_xs: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    route_ys: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    route_offsets: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # Indeks ime -> pozicija prvog signala sa tim imenom; dopunjuje se lenjo,
+    # pa prati i append direktno na self.signals (ostale izmene: invalidate_cache())
+    _name_index: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _indexed_count: int = field(default=0, init=False, repr=False, compare=False)
     
     def add_signal(self, signal: Signal):
         """Dodaje signal u kolo"""
         self.signals.append(signal)
     
+    def _index_signals(self, rebuild: bool = False):
+        """Dodaje u indeks imena signale koji još nisu indeksirani"""
+        if rebuild or self._indexed_count > len(self.signals):
+            self._name_index.clear()
+            self._indexed_count = 0
+        index = self._name_index
+        for i in range(self._indexed_count, len(self.signals)):
+            index.setdefault(self.signals[i].name, i)
+        self._indexed_count = len(self.signals)
+    
     def add_component(self, component: Component):
         """Dodaje komponentu u kolo"""
         self.components.append(component)
     
     def get_signal(self, name: str) -> Optional[Signal]:
         """Vraća signal po imenu"""
-        for signal in self.signals:
-            if signal.name == name:
-                return signal
-        return None
+        self._index_signals()
+        i = self._name_index.get(name)
+        if i is None:
+            return None
+        if self.signals[i].name != name:
+            # Indeks ne odgovara listi (signal uklonjen/preimenovan u mestu) - gradi se ponovo
+            self._index_signals(rebuild=True)
+            i = self._name_index.get(name)
+        return self.signals[i] if i is not None else None
     
     def exclude_signals(self, signal_names: List[str]):
         """Isključuje signale iz analize"""
+        names = set(signal_names)
         for signal in self.signals:
-            if signal.name in signal_names:
+            if signal.name in names:
                 signal.is_excluded = True
     
     def include_signals(self, signal_names: List[str]):
         """Uključuje signale u analizu"""
+        names = set(signal_names)
         for signal in self.signals:
-            if signal.name in signal_names:
+            if signal.name in names:
                 signal.is_excluded = False
     
     def get_active_signals(self) -> List[Signal]:
@@ -87,34 +215,146 @@ class Circuit:
         return [signal for signal in self.signals if not signal.is_excluded]
     
     def calculate_total_wire_length(self) -> float:
-        """Računa ukupnu dužinu žica za aktivne signale"""
-        return sum(signal.calculate_length() for signal in self.get_active_signals())
+        """Računa ukupnu dužinu žica za aktivne signale
+        
+        Sa numbom se dužine računaju kernelom nad pakovanim rutama. Bez nje se
+        rute spajaju u jedan niz, dužine segmenata računaju jednim prolazom,
+        a np.add.reduceat ih zatim sabira po signalu.
+        """
+        signals = [s for s in self.get_active_signals() if s.point_count() >= 2]
+        if not signals:
+            return 0.0
+        
+        # lenji uvoz - kernel se učitava tek kada se dužine zaista računaju
+        from . import _kernels
+        
+        if _kernels.HAS_NUMBA:
+            lengths, _ = self._bulk_length_bbox(signals)
+        else:
+            lengths = self._route_lengths(signals)
+        
+        for signal, length in zip(signals, lengths.tolist()):
+            signal.length = length
+            source = signal._route_source()
+            signal._length_cache = (source, len(source), length)
+        return float(lengths.sum())
+    
+    def _bulk_length_bbox(self, signals: List[Signal]) -> Tuple[np.ndarray, np.ndarray]:
+        """Dužine i (n, 4) bounding box-ovi signala, numba kernelom nad pack() nizovima"""
+        from ._kernels import bulk_length_bbox
+        
+        xs, ys, offsets = self.pack(signals)
+        lengths = np.empty(len(signals), dtype=np.float64)
+        bbox = np.empty((len(signals), 4), dtype=np.int32)
+        bulk_length_bbox(xs, ys, offsets, lengths, bbox)
+        return lengths, bbox
+    
+    @staticmethod
+    def _route_lengths(signals: List[Signal]) -> np.ndarray:
+        """Dužine ruta signala (svaki sa bar dve tačke) NumPy operacijama"""
+        counts = np.fromiter((s.point_count() for s in signals), dtype=np.int64, count=len(signals))
+        offsets = np.zeros(len(signals), dtype=np.int64)
+        np.cumsum(counts[:-1], out=offsets[1:])
+        
+        if any(s._coords is not None for s in signals):
+            # lenje rute (from_dict) se spajaju direktno iz koordinata
+            coords = np.concatenate([s.route_coords() for s in signals]).astype(np.float64)
+        else:
+            coords = _route_coords([p for s in signals for p in s.route])
+        seg = _segment_lengths(np.diff(coords, axis=0))
+        # Segment od poslednje tačke jednog signala do prve sledećeg nije deo rute
+        seg[offsets[1:] - 1] = 0.0
+        return np.add.reduceat(seg, offsets)
+    
+    def invalidate_cache(self):
+        """Briše keš izvedenih vrednosti svih signala, indeks imena i pakovane rute (posle masovnih izmena)"""
+        for signal in self.signals:
+            signal.invalidate_cache()
+        self._index_signals(rebuild=True)
+        self.route_xs = self.route_ys = self.route_offsets = None
+    
+    def pack(self, signals: Optional[List[Signal]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pakuje rute signala u ravne int32 nizove (route_xs, route_ys, route_offsets)
+        
+        Podrazumevano se pakuju svi signali. Lista signala ostaje izvor podataka,
+        pa pack() treba ponovo pozvati posle izmene ruta.
+        """
+        if signals is None:
+            signals = self.signals
+        
+        offsets = np.zeros(len(signals) + 1, dtype=np.int32)
+        np.cumsum(np.fromiter((s.point_count() for s in signals), dtype=np.int32, count=len(signals)),
+                  out=offsets[1:])
+        total = int(offsets[-1])
+        if any(s._coords is not None for s in signals):
+            # lenje rute (from_dict) se pakuju direktno iz koordinata
+            coords = np.concatenate([s.route_coords() for s in signals]).astype(np.int32, copy=False) \
+                if total else np.empty((0, 2), dtype=np.int32)
+            self.route_xs = np.ascontiguousarray(coords[:, 0])
+            self.route_ys = np.ascontiguousarray(coords[:, 1])
+        else:
+            self.route_xs = np.fromiter((p.x for s in signals for p in s.route), dtype=np.int32, count=total)
+            self.route_ys = np.fromiter((p.y for s in signals for p in s.route), dtype=np.int32, count=total)
+        self.route_offsets = offsets
+        return self.route_xs, self.route_ys, self.route_offsets
+    
+    def all_bounding_boxes(self, signals: Optional[List[Signal]] = None
+                           ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Bounding box-ovi svih signala kao nizovi (min_x, min_y, max_x, max_y)
+        
+        Računa se numba kernelom ili jednim reduceat prolazom nad pakovanim
+        rutama; signal bez rute dobija (0, 0, 0, 0), kao i u Signal.get_bounding_box.
+        """
+        from . import _kernels
+        
+        if _kernels.HAS_NUMBA:
+            _, bbox = self._bulk_length_bbox(self.signals if signals is None else signals)
+            min_x, min_y, max_x, max_y = np.ascontiguousarray(bbox.T)
+            return min_x, min_y, max_x, max_y
+        
+        xs, ys, offsets = self.pack(signals)
+        n = len(offsets) - 1
+        min_x, min_y, max_x, max_y = (np.zeros(n, dtype=np.int32) for _ in range(4))
+        
+        nonempty = offsets[1:] > offsets[:-1]
+        starts = offsets[:-1][nonempty]
+        if starts.size:
+            # prazni signali ne zauzimaju mesta u xs/ys, pa svaki segment
+            # [starts[k], starts[k + 1]) pokriva tačno jedan signal
+            min_x[nonempty] = np.minimum.reduceat(xs, starts)
+            min_y[nonempty] = np.minimum.reduceat(ys, starts)
+            max_x[nonempty] = np.maximum.reduceat(xs, starts)
+            max_y[nonempty] = np.maximum.reduceat(ys, starts)
+        return min_x, min_y, max_x, max_y
     
     def to_dict(self) -> Dict:
         """Konvertuje kolo u dictionary za JSON serijalizaciju"""
         return {
             'name': self.name,
-            'signals': [
-                {
-                    'name': s.name,
-                    'source': {'x': s.source.x, 'y': s.source.y} if s.source else None,
-                    'destination': {'x': s.destination.x, 'y': s.destination.y} if s.destination else None,
-                    'route': [{'x': p.x, 'y': p.y} for p in s.route],
-                    'length': s.length,
-                    'is_excluded': s.is_excluded
-                } for s in self.signals
-            ],
-            'components': [
-                {
-                    'name': c.name,
-                    'type': c.type,
-                    'position': {'x': c.position.x, 'y': c.position.y},
-                    'inputs': c.inputs,
-                    'outputs': c.outputs
-                } for c in self.components
-            ]
+            'signals': [s.to_dict() for s in self.signals],
+            'components': [c.to_dict() for c in self.components]
         }
     
+    def to_json_bytes(self) -> bytes:
+        """JSON kola (isti sadržaj kao to_dict, ključevi sortirani), bez celog stabla u memoriji
+        
+        Svaki signal i komponenta se serijalizuju zasebno i spajaju kao bajtovi,
+        pa u memoriji istovremeno postoje samo rečnici jednog signala.
+        """
+        if HAS_ORJSON:
+            def dumps(obj) -> bytes:
+                return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        else:
+            def dumps(obj) -> bytes:
+                return json.dumps(obj, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        
+        return b''.join((
+            b'{"components":[', b','.join(dumps(c.to_dict()) for c in self.components),
+            b'],"name":', dumps(self.name),
+            b',"signals":[', b','.join(dumps(s.to_dict()) for s in self.signals),
+            b']}',
+        ))
+    
     @classmethod
     def from_dict(cls, data: Dict) -> 'Circuit':
         """Kreira Circuit iz dictionary"""
@@ -128,7 +368,12 @@ class Circuit:
             if signal_data.get('destination'):
                 signal.destination = Point(**signal_data['destination'])
             
-            signal.route = [Point(**p) for p in signal_data.get('route', [])]
+            # Ruta se čuva kao jedan int32 niz; Point objekti se prave tek na zahtev
+            route = signal_data.get('route', [])
+            if route:
+                signal._coords = np.fromiter((c for p in route for c in (p['x'], p['y'])),
+                                             dtype=np.int32, count=2 * len(route)).reshape(-1, 2)
+                del signal.route
             signal.length = signal_data.get('length', 0.0)
             signal.is_excluded = signal_data.get('is_excluded', False)
             
@@ -4,6 +4,8 @@ import json
 
 class Point:
     """Represents a 2D point with x,y coordinates"""
+    __slots__ = ('x', 'y')
+
     def __init__(self, x: int = 0, y: int = 0):
         self.x = x
         self.y = y
@@ -21,6 +23,8 @@ class Point:
     
 class BoundingBox:
     """Represents a rectangular region defined by two points"""
+    __slots__ = ('min_point', 'max_point')
+
     def __init__(self, min_point: Point = None, max_point: Point = None):
         self.min_point = min_point if min_point is not None else Point()
         self.max_point = max_point if max_point is not None else Point()
@@ -49,7 +53,30 @@ class BoundingBox:
             "max_point": self.max_point.to_dict()
         }
     
-class LogicBlock:
+class _ExtrasMixin:
+    """Dodatni atributi iz parsera se čuvaju u rečniku extras (klase imaju __slots__)"""
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        # poziva se samo kada slot ne postoji; 'extras' se preskače da
+        # hasattr pre popunjavanja slotova (npr. pri unpickle-u) ne bi rekurzivno zvao sebe
+        if name != 'extras':
+            try:
+                return self.extras[name]
+            except KeyError:
+                pass
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {name: getattr(self, name) for name in self.__slots__ if name != 'extras'}
+        result.update(self.extras)
+        return result
+
+
+class LogicBlock(_ExtrasMixin):
+    __slots__ = ('type', 'x', 'y', 'inputs', 'outputs', 'name', 'extras')
+    _fields = ('type', 'x', 'y', 'inputs', 'outputs', 'name')
+
     def __init__(self,
                  type: str = "",
                  x: int = 0,
@@ -65,14 +92,21 @@ class LogicBlock:
         self.outputs = outputs
         self.name = name
         # Prihvata sve dodatne atribute koje parser može proslediti
-        for k, v in kwargs.items():
-            setattr(self, k, v)
+        self.extras = kwargs
 
-    def to_dict(self) -> Dict[str, Any]:
-        return self.__dict__.copy()
+    @classmethod
+    def from_row(cls, row: tuple, extras: Optional[Dict[str, Any]] = None) -> 'LogicBlock':
+        """Pravi blok iz torke vrednosti redom kao _fields, bez poziva __init__ (za parsere)"""
+        self = object.__new__(cls)
+        self.type, self.x, self.y, self.inputs, self.outputs, self.name = row
+        self.extras = extras if extras is not None else {}
+        return self
 
 
-class RoutingChannel:
+class RoutingChannel(_ExtrasMixin):
+    __slots__ = ('segment_id', 'direction', 'length', 'capacity', 'extras')
+    _fields = ('segment_id', 'direction', 'length', 'capacity')
+
     def __init__(self,
                  segment_id: int = 0,
                  direction: str = "",
@@ -84,11 +118,15 @@ class RoutingChannel:
         self.length = length
         self.capacity = capacity
         # Dodatni atributi iz parsera (npr. track_ids, segment_type, switches)
-        for k, v in kwargs.items():
-            setattr(self, k, v)
-
-    def to_dict(self) -> Dict[str, Any]:
-        return self.__dict__.copy()
+        self.extras = kwargs
+
+    @classmethod
+    def from_row(cls, row: tuple, extras: Optional[Dict[str, Any]] = None) -> 'RoutingChannel':
+        """Pravi kanal iz torke vrednosti redom kao _fields, bez poziva __init__ (za parsere)"""
+        self = object.__new__(cls)
+        self.segment_id, self.direction, self.length, self.capacity = row
+        self.extras = extras if extras is not None else {}
+        return self
 
 
 class FPGAArchitecture:
@@ -1,10 +1,59 @@
+import json
+import logging
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, TextIO, Tuple
+import numpy as np
 from .fpga_architecture import FPGAArchitecture
 from .circuit import Circuit
 
+logger = logging.getLogger(__name__)
+
+# Kodovi tipova čvorova za NumPy maske u NetRoute._find_next_nodes
+NODE_TYPE_CODES = {'SOURCE': 0, 'OPIN': 1, 'CHANX': 2, 'CHANY': 3, 'IPIN': 4, 'SINK': 5}
+_SOURCE, _OPIN, _CHANX, _CHANY, _IPIN, _SINK = range(6)
+
+# Tipovi čvorova na koje se može nastaviti kanal (NetRoute._find_routing_connection_point)
+_CONNECTION_TYPES = frozenset(('CHANX', 'CHANY', 'OPIN'))
+
+
+def _same_location(types, dx, dy, target):
+    return (types == target) & (dx == 0) & (dy == 0)
+
+
+def _adjacent(dx, dy):
+    return (np.abs(dx) <= 1) & (np.abs(dy) <= 1)
+
+
+# Tip trenutnog čvora -> maska kandidata nad (types, dx, dy) svih čvorova neta;
+# isto kao _is_adjacent_or_same / _is_routing_continuation, ali za sve čvorove odjednom
+# (sa numbom isto računa _kernels.next_node_mask u jednom prolazu)
+_NEXT_NODE_MASKS = {
+    # SOURCE -> OPIN na istoj lokaciji
+    _SOURCE: lambda t, dx, dy: _same_location(t, dx, dy, _OPIN),
+    # OPIN -> CHANX/CHANY koji počinje rutiranje
+    _OPIN: lambda t, dx, dy: ((t == _CHANX) | (t == _CHANY)) & _adjacent(dx, dy),
+    # CHANX -> CHANY/IPIN u susedstvu ili horizontalni nastavak
+    _CHANX: lambda t, dx, dy: (((t == _CHANY) | (t == _IPIN)) & _adjacent(dx, dy)
+                               | (t == _CHANX) & (dy == 0) & (np.abs(dx) == 1)),
+    # CHANY -> CHANX/IPIN u susedstvu ili vertikalni nastavak
+    _CHANY: lambda t, dx, dy: (((t == _CHANX) | (t == _IPIN)) & _adjacent(dx, dy)
+                               | (t == _CHANY) & (dx == 0) & (np.abs(dy) == 1)),
+    # IPIN -> SINK na istoj lokaciji
+    _IPIN: lambda t, dx, dy: _same_location(t, dx, dy, _SINK),
+}
+
 class RouteSegment:
-    """Čvor u routing stablu (ne samo segment!)"""
+    """Čvor u routing stablu (ne samo segment!)
+    
+    Čvorova ima po jedan za svaki red .route fajla, pa klasa koristi __slots__.
+    Dodatni atributi iz parsera (Pin, Class, Net_pin_index, ...) čuvaju se u
+    ravnoj torci _extra = (ime, vrednost, ime, vrednost, ...) i čitaju se
+    kao obični atributi (seg.pin); čvor bez njih deli praznu torku.
+    """
+    __slots__ = ('node_id', 'node_type', 'x', 'y', 'track', 'switch_id', 'pad',
+                 'children', 'parent', 'channel_id', 'offset', '_extra')
+    
     def __init__(self, 
                  node_id: int = 0,
                  node_type: str = '',
@@ -28,14 +77,34 @@ class RouteSegment:
         self.parent: Optional['RouteSegment'] = None
         
         # Legacy polja (za kompatibilnost)
-        self.channel_id = kwargs.get('channel_id', 0)
-        self.offset = kwargs.get('offset', 0)
+        self.channel_id = kwargs.pop('channel_id', 0) if kwargs else 0
+        self.offset = kwargs.pop('offset', 0) if kwargs else 0
         
         # Dodatni atributi (Pad, Pin, Layer, ...)
-        for k, v in kwargs.items():
-            if k not in ('node_id', 'node_type', 'x', 'y', 'track', 'switch_id', 
-                        'channel_id', 'offset', 'pad'):
-                setattr(self, k, v)
+        self._extra = tuple(item for pair in kwargs.items() for item in pair) if kwargs else ()
+    
+    def __getattr__(self, name: str) -> Any:
+        # poziva se samo kada slot ne postoji; '_extra' se preskače da
+        # hasattr pre popunjavanja slotova ne bi rekurzivno zvao sebe
+        if name != '_extra':
+            extra = self._extra
+            for i in range(0, len(extra), 2):
+                if extra[i] == name:
+                    return extra[i + 1]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def __getstate__(self):
+        # ravna torka umesto rečnika slotova: manji pickle i brži prenos radnim procesima.
+        # Veze stabla (children/parent) se ne pakuju: pickle bi se tada spuštao
+        # rekurzivno po dubini stabla; čuva ih NetRoute.__getstate__ kao indekse
+        return (self.node_id, self.node_type, self.x, self.y, self.track, self.switch_id,
+                self.pad, self.channel_id, self.offset, self._extra)
+    
+    def __setstate__(self, state):
+        (self.node_id, self.node_type, self.x, self.y, self.track, self.switch_id,
+         self.pad, self.channel_id, self.offset, self._extra) = state
+        self.children = []
+        self.parent = None
     
     def is_io_pad(self) -> bool:
         """Da li je IO pad (SOURCE/SINK sa Pad oznakom)"""
@@ -64,18 +133,40 @@ class RouteSegment:
         return list(reversed(path))
     
     def get_all_paths_to_leaves(self) -> List[List['RouteSegment']]:
-        """Rekurzivno vraća sve putanje od ovog čvora do listova"""
-        if self.is_leaf():
-            return [[self]]
+        """Vraća sve putanje od ovog čvora do listova
         
+        Obilazak je iterativan (eksplicitni stek), pa duboka stabla ne udaraju
+        u limit rekurzije; redosled putanja je isti kao kod rekurzivnog DFS-a.
+        """
         all_paths = []
-        for child in self.children:
-            child_paths = child.get_all_paths_to_leaves()
-            for path in child_paths:
-                all_paths.append([self] + path)
+        path = []
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            del path[depth:]
+            path.append(node)
+            if node.is_leaf():
+                all_paths.append(list(path))
+            else:
+                stack.extend((child, depth + 1) for child in reversed(node.children))
         
         return all_paths
     
+    def count_leaves(self) -> int:
+        """Broj listova (SINK) u podstablu, bez pravljenja lista putanja
+        
+        Jednak je len(get_all_paths_to_leaves()), ali obilazi stablo jednom.
+        """
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf():
+                count += 1
+            else:
+                stack.extend(node.children)
+        return count
+    
     def to_dict(self, include_children: bool = False) -> Dict[str, Any]:
         """Serijalizacija u dict"""
         result = {
@@ -91,15 +182,44 @@ class RouteSegment:
         }
         
         # Dodaj sve custom atribute
-        for k, v in self.__dict__.items():
-            if k not in result and k not in ('children', 'parent'):
-                result[k] = v
+        extra = self._extra
+        for i in range(0, len(extra), 2):
+            if extra[i] not in result:
+                result[extra[i]] = extra[i + 1]
         
         if include_children:
-            result['children'] = [c.to_dict(include_children=True) 
-                                 for c in self.children]
+            # Podstablo se gradi iterativno: rečnik deteta se pravi bez dece,
+            # a njegova lista 'children' se popunjava kada dođe na red sa steka
+            stack = [(self, result)]
+            while stack:
+                node, node_dict = stack.pop()
+                children = [c.to_dict() for c in node.children]
+                node_dict['children'] = children
+                stack.extend(zip(node.children, children))
         
         return result
+    
+    def iter_json(self, encode) -> Iterator[str]:
+        """JSON podstabla u delovima, isti tekst kao encode(to_dict(include_children=True))
+        
+        Rečnik se pravi za jedan po jedan čvor (dubinski), pa se celo
+        podstablo nikad ne drži u memoriji kao ugnježdeni dict.
+        """
+        # Na steku su čvorovi i završni delovi ("]}" / ", ") između njih
+        stack = [self]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                yield item
+                continue
+            # 'children' je poslednji ključ, pa se dodaje na kraj objekta
+            yield encode(item.to_dict())[:-1] + ', "children": ['
+            stack.append(']}')
+            children = item.children
+            for k in range(len(children) - 1, -1, -1):
+                stack.append(children[k])
+                if k:
+                    stack.append(', ')
 
 
 class NetRoute:
@@ -117,12 +237,23 @@ class NetRoute:
         # segments = flat list (za legacy)
         self.segments = segments if segments is not None else []
         
+        # node_id -> čvor u stablu; popunjava ga _build_vpr_tree_sequential
+        self._node_index: Dict[int, RouteSegment] = {}
+        
+        # Keš putanja i njihovih koordinata; briše ga _invalidate_caches()
+        self._paths_cache: Optional[List[List[RouteSegment]]] = None
+        self._coords_cache: Optional[List[List[tuple]]] = None
+        
+        # (node_map, broj čvorova, čvorovi, xs, ys, types) za _find_next_nodes
+        self._node_arrays: Optional[tuple] = None
+        
         # dodatni atributi
         for k, v in kwargs.items():
             setattr(self, k, v)
     
     def build_tree_from_segments(self):
         """Konvertuje linearnu listu segmenata u stablo koristeći VPR routing semantiku"""
+        self._invalidate_caches()
         if not self.segments:
             return
         
@@ -143,41 +274,43 @@ class NetRoute:
     
     def _build_vpr_tree_sequential(self):
         """Build tree from VPR route file sequential format"""
+        self._invalidate_caches()
         if len(self.segments) < 2:
             return
             
-        # Create node map for fast lookup
-        node_map = {}
-        for seg in self.segments:
-            if seg.node_id not in node_map:
-                node_map[seg.node_id] = []
-            node_map[seg.node_id].append(seg)
-        
-        # Track which nodes have been processed
-        processed_nodes = set()
+        # Indeks čvorova koji su već u stablu (node_id -> čvor); ponovljeni
+        # node_id je tačka grananja i nalazi se jednim lookup-om umesto DFS-a
+        node_index = {self.root.node_id: self.root}
+        self._node_index = node_index
         
         # Start with root
         current_parent = self.root
-        processed_nodes.add(self.root.node_id)
+        
+        # node_id su int-ovi, čiji je hash sama vrednost, pa je dict već
+        # "identity" indeks; id-jevi jednog neta su retki u RR grafu (raspon
+        # je ~100x broj čvorova), pa lista indeksirana po id-ju ne isplati
+        segments = self.segments
+        n = len(segments)
+        lookup = node_index.get
         
         i = 1  # Start from second segment (first is SOURCE)
         
-        while i < len(self.segments):
-            seg = self.segments[i]
+        while i < n:
+            seg = segments[i]
+            node_id = seg.node_id
             
             # If this node ID was already processed, it's a branch point
-            if seg.node_id in processed_nodes:
+            branch = lookup(node_id)
+            if branch is not None:
                 # Find the previously processed node with this ID
-                branch_point = self._find_node_in_tree(self.root, seg.node_id)
-                if branch_point:
-                    current_parent = branch_point
-                    print(f"🌿 Branch detected at Node {seg.node_id} ({seg.node_type} {seg.x},{seg.y})")
+                current_parent = branch
+                logger.debug("🌿 Branch detected at Node %d (%s %d,%d)", node_id, seg.node_type, seg.x, seg.y)
                 i += 1
                 continue
             
             # Add this segment to the current parent
             current_parent.add_child(seg)
-            processed_nodes.add(seg.node_id)
+            node_index[node_id] = seg
             
             # Move to this node as the new parent (unless it's a SINK)
             if seg.node_type != 'SINK':
@@ -185,9 +318,8 @@ class NetRoute:
             else:
                 # SINK ends a path, go back to find the branch point for next path
                 # Look ahead to see if next segment is a repeat (branch indicator)
-                if i + 1 < len(self.segments):
-                    next_seg = self.segments[i + 1]
-                    if next_seg.node_id in processed_nodes:
+                if i + 1 < n:
+                    if segments[i + 1].node_id in node_index:
                         # Next is a branch, don't change current_parent yet
                         pass
                     else:
@@ -196,15 +328,74 @@ class NetRoute:
             
             i += 1
     
+    def __getstate__(self):
+        # keš putanja se ne šalje u pickle (npr. radnim procesima), gradi se ponovo
+        state = self.__dict__.copy()
+        state['_paths_cache'] = None
+        state['_coords_cache'] = None
+        state['_node_arrays'] = None
+        state['_tree_links'] = self._tree_links()
+        return state
+    
+    def __setstate__(self, state):
+        extra_nodes, children, parents = state.pop('_tree_links')
+        self.__dict__.update(state)
+        
+        nodes = self.segments + extra_nodes
+        for node, child_ids, parent_id in zip(nodes, children, parents):
+            node.children = [nodes[j] for j in child_ids]
+            node.parent = nodes[parent_id] if parent_id >= 0 else None
+    
+    def _tree_links(self) -> tuple:
+        """Veze stabla kao indeksi u segments + extra_nodes (za pickle bez rekurzije)
+        
+        Vraća (extra_nodes, children, parents): extra_nodes su čvorovi povezani
+        sa stablom koji nisu u segments, children[i] su indeksi dece čvora i,
+        a parents[i] indeks roditelja ili -1.
+        """
+        nodes = list(self.segments)
+        index = {id(node): i for i, node in enumerate(nodes)}
+        if self.root is not None and id(self.root) not in index:
+            index[id(self.root)] = len(nodes)
+            nodes.append(self.root)
+        
+        # Zatvorenje po vezama; lista se proširuje dok se prolazi kroz nju
+        i = 0
+        while i < len(nodes):
+            node = nodes[i]
+            for other in (*node.children, node.parent):
+                if other is not None and id(other) not in index:
+                    index[id(other)] = len(nodes)
+                    nodes.append(other)
+            i += 1
+        
+        children = tuple(tuple(index[id(c)] for c in node.children) for node in nodes)
+        parents = tuple(index[id(node.parent)] if node.parent is not None else -1
+                        for node in nodes)
+        return nodes[len(self.segments):], children, parents
+    
+    def _invalidate_caches(self):
+        """Briše keširane putanje i koordinate (pozvati posle svake izmene stabla)"""
+        self._paths_cache = None
+        self._coords_cache = None
+    
     def _find_node_in_tree(self, root: 'RouteSegment', node_id: int) -> Optional['RouteSegment']:
-        """Recursively find a node with given ID in the tree"""
-        if root.node_id == node_id:
-            return root
+        """Find a node with given ID in the tree
+        
+        Za koren stabla se prvo gleda _node_index; BFS je rezerva za podstabla
+        i stabla koja nisu građena kroz _build_vpr_tree_sequential.
+        """
+        if root is self.root:
+            node = self._node_index.get(node_id)
+            if node is not None:
+                return node
         
-        for child in root.children:
-            result = self._find_node_in_tree(child, node_id)
-            if result:
-                return result
+        queue = deque((root,))
+        while queue:
+            node = queue.popleft()
+            if node.node_id == node_id:
+                return node
+            queue.extend(node.children)
         
         return None
     
@@ -228,21 +419,23 @@ class NetRoute:
     
     def _find_routing_connection_point(self, target_seg: 'RouteSegment') -> Optional['RouteSegment']:
         """Find a node in the tree that could logically connect to target segment"""
-        def search_tree(node: 'RouteSegment') -> Optional['RouteSegment']:
+        # Preorder DFS sa eksplicitnim stekom (isti redosled kao rekurzija, pa
+        # i isti izabrani roditelj); vraća se na prvom pogotku. Uslov iz
+        # _is_adjacent_or_same je uvučen u petlju.
+        tx = target_seg.x
+        ty = target_seg.y
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
             # Check if this node could connect to target
-            if (node.node_type in ['CHANX', 'CHANY', 'OPIN'] and
-                self._is_adjacent_or_same(node, target_seg)):
+            if (node.node_type in _CONNECTION_TYPES and
+                abs(node.x - tx) <= 1 and abs(node.y - ty) <= 1):
                 return node
             
             # Search children
-            for child in node.children:
-                result = search_tree(child)
-                if result:
-                    return result
-            
-            return None
+            stack.extend(reversed(node.children))
         
-        return search_tree(self.root)
+        return None
     
     def _build_tree_recursive(self, current_node: 'RouteSegment', node_map: Dict[int, 'RouteSegment'], visited: set):
         """Rekurzivno gradi stablo na osnovu routing logike"""
@@ -256,43 +449,45 @@ class NetRoute:
                 current_node.add_child(next_node)
                 self._build_tree_recursive(next_node, node_map, visited)
     
+    def _get_node_arrays(self, node_map: Dict[int, 'RouteSegment']) -> tuple:
+        """Čvorovi iz node_map i njihovi x/y/tip kao NumPy nizovi (SoA), keširano po node_map"""
+        cached = self._node_arrays
+        if cached is not None and cached[0] is node_map and cached[1] == len(node_map):
+            return cached[2:]
+        
+        nodes = list(node_map.values())
+        n = len(nodes)
+        xs = np.fromiter((node.x for node in nodes), dtype=np.int32, count=n)
+        ys = np.fromiter((node.y for node in nodes), dtype=np.int32, count=n)
+        types = np.fromiter((NODE_TYPE_CODES.get(node.node_type, -1) for node in nodes),
+                            dtype=np.int8, count=n)
+        self._node_arrays = (node_map, n, nodes, xs, ys, types)
+        return nodes, xs, ys, types
+    
     def _find_next_nodes(self, current: 'RouteSegment', node_map: Dict[int, 'RouteSegment'], visited: set) -> List['RouteSegment']:
-        """Pronalazi sledeće čvorove u routing sekvenci"""
-        next_nodes = []
-        
-        # Za SOURCE, traži OPIN na istoj lokaciji
-        if current.node_type == 'SOURCE':
-            for node in node_map.values():
-                if (node.node_type == 'OPIN' and 
-                    node.x == current.x and node.y == current.y and
-                    node.node_id not in visited):
-                    next_nodes.append(node)
-        
-        # Za OPIN, traži CHANX/CHANY koji počinje rutiranje
-        elif current.node_type == 'OPIN':
-            for node in node_map.values():
-                if (node.node_type in ['CHANX', 'CHANY'] and
-                    node.node_id not in visited and
-                    self._is_adjacent_or_same(current, node)):
-                    next_nodes.append(node)
-        
-        # Za CHANX/CHANY, traži sledeći routing čvor ili IPIN
-        elif current.node_type in ['CHANX', 'CHANY']:
-            for node in node_map.values():
-                if (node.node_id not in visited and
-                    (node.node_type in ['CHANX', 'CHANY', 'IPIN'] and
-                     self._is_routing_continuation(current, node))):
-                    next_nodes.append(node)
-        
-        # Za IPIN, traži SINK na istoj lokaciji
-        elif current.node_type == 'IPIN':
-            for node in node_map.values():
-                if (node.node_type == 'SINK' and
-                    node.x == current.x and node.y == current.y and
-                    node.node_id not in visited):
-                    next_nodes.append(node)
-        
-        return next_nodes
+        """Pronalazi sledeće čvorove u routing sekvenci
+        
+        Pravila po tipu trenutnog čvora računaju se nad svim čvorovima neta
+        odjednom: numba kernelom, ili NumPy maskama (_NEXT_NODE_MASKS) bez nje.
+        Redosled je isti kao u node_map.
+        """
+        current_type = NODE_TYPE_CODES.get(current.node_type)
+        if current_type not in _NEXT_NODE_MASKS or not node_map:
+            return []
+        
+        # lenji uvoz - kernel se učitava tek kada se stablo zaista gradi ovako
+        from . import _kernels
+        
+        nodes, xs, ys, types = self._get_node_arrays(node_map)
+        if _kernels.HAS_NUMBA:
+            mask = np.empty(len(nodes), dtype=np.bool_)
+            _kernels.next_node_mask(types, xs, ys, current_type, current.x, current.y, mask)
+        else:
+            mask = _NEXT_NODE_MASKS[current_type](types, xs - current.x, ys - current.y)
+        
+        # Maska propušta malo čvorova, pa se posećeni proveravaju samo među kandidatima
+        return [node for node in map(nodes.__getitem__, np.flatnonzero(mask).tolist())
+                if node.node_id not in visited]
     
     def _is_adjacent_or_same(self, node1: 'RouteSegment', node2: 'RouteSegment') -> bool:
         """Proverava da li su čvorovi susedni ili na istoj lokaciji"""
@@ -330,23 +525,34 @@ class NetRoute:
         return False
     
     def get_all_source_to_sink_paths(self) -> List[List[RouteSegment]]:
-        """Vraća sve putanje od SOURCE do svih SINK-ova"""
+        """Vraća sve putanje od SOURCE do svih SINK-ova (keširano, ne menjati listu)"""
         if not self.root:
             return []
-        return self.root.get_all_paths_to_leaves()
+        if self._paths_cache is None:
+            self._paths_cache = self.root.get_all_paths_to_leaves()
+        return self._paths_cache
+    
+    @property
+    def fanout(self) -> int:
+        """Broj SOURCE→SINK putanja (listova stabla); 0 ako stablo nije izgrađeno"""
+        if not self.root:
+            return 0
+        return self.root.count_leaves()
     
     def get_path_coordinates(self) -> List[List[tuple]]:
-        """Vraća koordinate svih putanja (za vizuelizaciju)"""
-        paths = self.get_all_source_to_sink_paths()
-        return [
-            [(seg.x, seg.y) for seg in path]
-            for path in paths
-        ]
+        """Vraća koordinate svih putanja (za vizuelizaciju; keširano, ne menjati listu)"""
+        if self._coords_cache is None:
+            paths = self.get_all_source_to_sink_paths()
+            self._coords_cache = [
+                [(seg.x, seg.y) for seg in path]
+                for path in paths
+            ]
+        return self._coords_cache
 
     def to_dict(self, include_tree: bool = True) -> Dict[str, Any]:
         """Serijalizacija sa tree strukturom"""
         extra = {k: v for k, v in self.__dict__.items() 
-                if k not in ("net_name", "segments", "root")}
+                if k not in ("net_name", "segments", "root") and not k.startswith('_')}
         
         result = {
             "net_name": self.net_name,
@@ -359,6 +565,20 @@ class NetRoute:
             result['paths'] = self.get_path_coordinates()
         
         return result
+    
+    def iter_json(self, encode, include_tree: bool = True) -> Iterator[str]:
+        """JSON neta u delovima, isti tekst kao encode(to_dict(include_tree))
+        
+        Stablo se emituje preko RouteSegment.iter_json umesto kao jedan
+        ugnježdeni dict.
+        """
+        head = self.to_dict(include_tree=False)
+        if not (include_tree and self.root):
+            yield encode(head)
+            return
+        yield encode(head)[:-1] + ', "tree": '
+        yield from self.root.iter_json(encode)
+        yield ', "paths": ' + encode(self.get_path_coordinates()) + '}'
 
 
 class RoutingResult:
@@ -386,19 +606,37 @@ class RoutingResult:
         for k, v in kwargs.items():
             setattr(self, k, v)
 
+    def with_routes(self, routes: List[NetRoute], **kwargs: Any) -> 'RoutingResult':
+        """Lagani pogled sa drugim skupom ruta
+        
+        Zagušenje, kolo i arhitektura se dele po referenci (ne kopiraju se);
+        kwargs menjaju ostala polja (npr. successful=True).
+        """
+        fields = {
+            'congestion': self.congestion,
+            'metadata': self.metadata,
+            'circuit': self.circuit,
+            'architecture': self.architecture,
+            'successful': self.successful,
+        }
+        fields.update(kwargs)
+        return RoutingResult(routes=routes, **fields)
+
     def calculate_congestion_metrics(self) -> Dict[str, float]:
         """Računa različite metrike zagušenja"""
         if not self.congestion:
             return {}
 
-        congestion_values = list(self.congestion.values())
+        # jedna konverzija u niz, ostale metrike su C-level redukcije nad njim
+        values = np.fromiter(self.congestion.values(), dtype=np.float64,
+                             count=len(self.congestion))
 
         return {
-            'max_congestion': max(congestion_values) if congestion_values else 0.0,
-            'avg_congestion': sum(congestion_values) / len(congestion_values) if congestion_values else 0.0,
-            'min_congestion': min(congestion_values) if congestion_values else 0.0,
-            'congested_segments': len([v for v in congestion_values if v > 0.8]),
-            'total_segments': len(congestion_values)
+            'max_congestion': float(values.max()),
+            'avg_congestion': float(values.mean()),
+            'min_congestion': float(values.min()),
+            'congested_segments': int(np.count_nonzero(values > 0.8)),
+            'total_segments': int(values.size)
         }
 
     def get_high_congestion_segments(self, threshold: float = 0.8) -> List[str]:
@@ -407,15 +645,46 @@ class RoutingResult:
                 if congestion > threshold]
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            'routes': [r.to_dict() for r in self.routes],
-            'congestion': dict(self.congestion),
-            'metadata': dict(self.metadata),
-            'successful': self.successful,
-            'total_wire_length': self.total_wire_length,
-            'iteration_count': self.iteration_count,
-            'timing_data': dict(self.timing_data)
-        }
+        return dict(self.iter_dict(), routes=[r.to_dict() for r in self.routes])
+    
+    def iter_dict(self) -> Iterator[Tuple[str, Any]]:
+        """Parovi (ključ, vrednost) kao u to_dict, ali su 'routes' generator
+        
+        Rečnik rute se pravi tek kada na njega dođe red, pa ga potrošač
+        (npr. dump_json) može odbaciti pre sledećeg.
+        """
+        yield 'routes', (r.to_dict() for r in self.routes)
+        yield 'congestion', dict(self.congestion)
+        yield 'metadata', dict(self.metadata)
+        yield 'successful', self.successful
+        yield 'total_wire_length', self.total_wire_length
+        yield 'iteration_count', self.iteration_count
+        yield 'timing_data', dict(self.timing_data)
+    
+    def dump_json(self, fp: TextIO, default=None):
+        """Upisuje to_dict() kao JSON u fp bez pravljenja celog rečnika
+        
+        Tekst je isti kao json.dump(self.to_dict(), fp, default=default), ali
+        se rute (i njihova stabla) serijalizuju jedna po jedna, pa vršna
+        memorija ne raste sa veličinom rezultata.
+        """
+        encode = json.JSONEncoder(default=default).encode
+        write = fp.write
+        sep = '{'
+        for key, value in self.iter_dict():
+            write(sep + encode(key) + ': ')
+            sep = ', '
+            if key == 'routes':
+                write('[')
+                for i, route in enumerate(self.routes):
+                    if i:
+                        write(', ')
+                    for chunk in route.iter_json(encode):
+                        write(chunk)
+                write(']')
+            else:
+                write(encode(value))
+        write('}')
     
     def get_route_statistics(self) -> Dict[str, Any]:
         """Statistika routing stabala"""
@@ -1,7 +1,12 @@
+import sys
 import xml.etree.ElementTree as ET
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from models.fpga_architecture import FPGAArchitecture, LogicBlock, RoutingChannel
 
+# Smerovi kanala; jedan interniran string za sve RoutingChannel objekte
+_HORIZONTAL = sys.intern("horizontal")
+_VERTICAL = sys.intern("vertical")
+
 class ArchitectureParser:
     """Parser za VTR RRG (Routing Resource Graph) XML fajlove"""
     
@@ -11,10 +16,7 @@ class ArchitectureParser:
     def parse_architecture(self, file_path: str) -> FPGAArchitecture:
         """Parsira FPGA arhitekturu iz RRG XML fajla"""
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            return self._parse_rrg_document(root)
+            return self._parse_rrg_document(file_path)
             
         except ET.ParseError as e:
             raise ValueError(f"Greška pri parsiranju XML fajla: {e}")
@@ -29,176 +31,163 @@ class ArchitectureParser:
         """Alias za kompatibilnost — poziva parse_architecture"""
         return self.parse_architecture(file_path)
     
-    def _parse_rrg_document(self, root: ET.Element) -> FPGAArchitecture:
-        """Parsira celokupan RRG XML dokument"""
+    def _parse_rrg_document(self, file_path: str) -> FPGAArchitecture:
+        """Parsira celokupan RRG XML dokument u jednom prolazu (iterparse)
+        
+        Ceo DOM se ne pravi: svaki element drugog nivoa (x_list, switch,
+        block_type, grid_loc, node, edge...) se obradi na svom 'end' događaju
+        i odmah obriše, pa memorija ne raste sa rr_nodes/rr_edges sekcijama.
+        Kao i ranije sa root.find, važi samo prva sekcija svakog imena.
+        """
+        root = None
+        section = None      # trenutna sekcija (dete root-a)
+        depth = 0
+        seen = set()        # već obrađene sekcije
+        
+        grid_w = 0
+        grid_h = 0
+        chan_width_max = None   # atribut prvog <channel>, None ako ga nema
+        switch_count = 0
+        segment_count = 0
+        block_types = {}    # block_type_id -> (ime, inputs, outputs)
+        grid_locs = []
+        
+        for event, elem in ET.iterparse(file_path, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2:
+                    section = elem
+                continue
+            
+            depth -= 1
+            if depth == 1:
+                # Kraj sekcije; deca su već obrisana
+                seen.add(elem.tag)
+                elem.clear()
+                section = None
+                continue
+            if depth != 2:
+                continue
+            
+            tag = elem.tag
+            name = section.tag
+            if name in seen:
+                pass
+            elif name == 'channels':
+                if tag == 'x_list':
+                    grid_w += 1
+                elif tag == 'y_list':
+                    grid_h += 1
+                elif tag == 'channel' and chan_width_max is None:
+                    chan_width_max = elem.get('chan_width_max', '')
+            elif name == 'block_types':
+                if tag == 'block_type':
+                    block_type_id, template = self._parse_block_type(elem)
+                    block_types[block_type_id] = template
+            elif name == 'grid':
+                if tag == 'grid_loc':
+                    grid_locs.append((int(elem.get('block_type_id', '0')),
+                                      int(elem.get('x', '0')),
+                                      int(elem.get('y', '0'))))
+            elif name == 'switches':
+                if tag == 'switch':
+                    switch_count += 1
+            elif name == 'segments':
+                if tag == 'segment':
+                    segment_count += 1
+            # Obrađeno dete se briše iz sekcije
+            section.clear()
+        
         # Osnovni podaci o arhitekturi iz RRG
         architecture = FPGAArchitecture(
             name=root.get('tool_name', 'Unknown'),
-            width=self._parse_grid_width(root),
-            height=self._parse_grid_height(root)
+            width=grid_w,
+            height=grid_h
         )
         
-        # Parsiranje block_types (logic blocks)
-        architecture.logic_blocks = self._parse_block_types(root)
-        
-        # Parsiranje channels (routing channels)
-        architecture.routing_channels = self._parse_channels(root)
-        
-        # Parsiranje grid pozicija
-        self._parse_grid_locations(root, architecture)
-        
-        # Parsiranje parametara
-        architecture.parameters = self._parse_rrg_parameters(root)
+        # Routing channels
+        if chan_width_max is not None:
+            architecture.routing_channels = self._build_channels(
+                grid_w, grid_h, int(chan_width_max or '8'))
+        
+        # Logic blocks: po jedan za svaku grid lokaciju
+        architecture.logic_blocks = self._build_logic_blocks(block_types, grid_locs)
+        
+        # Parametri
+        parameters = {
+            'tool_name': root.get('tool_name', ''),
+            'tool_version': root.get('tool_version', ''),
+        }
+        if chan_width_max is not None:
+            parameters['chan_width_max'] = chan_width_max
+            parameters['grid_width'] = str(grid_w)
+            parameters['grid_height'] = str(grid_h)
+        if 'switches' in seen:
+            parameters['switch_count'] = str(switch_count)
+        if 'segments' in seen:
+            parameters['segment_count'] = str(segment_count)
+        architecture.parameters = parameters
         
         return architecture
     
-    def _parse_grid_width(self, root: ET.Element) -> int:
-        """Određuje širinu grid-a iz channels sekcije"""
-        channels = root.find('channels')
-        if channels is not None:
-            x_lists = channels.findall('x_list')
-            if x_lists:
-                return len(x_lists)
-        return 0
-    
-    def _parse_grid_height(self, root: ET.Element) -> int:
-        """Određuje visinu grid-a iz channels sekcije"""
-        channels = root.find('channels')
-        if channels is not None:
-            y_lists = channels.findall('y_list')
-            if y_lists:
-                return len(y_lists)
-        return 0
-    
-    def _parse_block_types(self, root: ET.Element) -> List[LogicBlock]:
-        """Parsira block_types iz RRG XML-a"""
-        logic_blocks = []
-        block_types_element = root.find('block_types')
-        
-        if block_types_element is not None:
-            for block_type_elem in block_types_element.findall('block_type'):
-                block_type_id = int(block_type_elem.get('id', '0'))
-                block_name = block_type_elem.get('name', '')
-                
-                # Brojanje input i output pinova
-                inputs = 0
-                outputs = 0
-                
-                for pin_class in block_type_elem.findall('pin_class'):
-                    pin_class_type = pin_class.get('type', '')
-                    pins_count = len(pin_class.findall('pin'))
-                    
-                    if pin_class_type == 'INPUT':
-                        inputs += pins_count
-                    elif pin_class_type == 'OUTPUT':
-                        outputs += pins_count
-                
-                block = LogicBlock(
-                    type=block_name,
-                    x=0,  # Postavićemo kasnije iz grid lokacija
-                    y=0,
-                    inputs=inputs,
-                    outputs=outputs,
-                    name=f"{block_name}_{block_type_id}",
-                    block_type_id=block_type_id
-                )
-                logic_blocks.append(block)
+    def _parse_block_type(self, block_type_elem: ET.Element) -> Tuple[int, Tuple[str, int, int]]:
+        """Vraća (block_type_id, (ime, inputs, outputs)) iz <block_type> elementa"""
+        block_type_id = int(block_type_elem.get('id', '0'))
+        block_name = block_type_elem.get('name', '')
+        
+        # Brojanje input i output pinova
+        inputs = 0
+        outputs = 0
+        
+        for pin_class in block_type_elem.findall('pin_class'):
+            pin_class_type = pin_class.get('type', '')
+            pins_count = len(pin_class.findall('pin'))
+            
+            if pin_class_type == 'INPUT':
+                inputs += pins_count
+            elif pin_class_type == 'OUTPUT':
+                outputs += pins_count
         
-        return logic_blocks
+        return block_type_id, (block_name, inputs, outputs)
     
-    def _parse_channels(self, root: ET.Element) -> List[RoutingChannel]:
-        """Parsira routing channels iz RRG XML-a"""
-        routing_channels = []
-        channels_element = root.find('channels')
-        
-        if channels_element is not None:
-            # Parsiranje channel konfiguracije
-            channel_elem = channels_element.find('channel')
-            if channel_elem is not None:
-                chan_width = int(channel_elem.get('chan_width_max', '8'))
-                
-                # Kreiranje routing kanala na osnovu grid dimenzija
-                width = self._parse_grid_width(root)
-                height = self._parse_grid_height(root)
-                
-                channel_id = 0
-                for x in range(width):
-                    for y in range(height):
-                        # Horizontalni kanali
-                        if x < width - 1:
-                            routing_channels.append(
-                                RoutingChannel(
-                                    segment_id=channel_id,
-                                    direction="horizontal",
-                                    length=1,
-                                    capacity=chan_width
-                                )
-                            )
-                            channel_id += 1
-                        
-                        # Vertikalni kanali
-                        if y < height - 1:
-                            routing_channels.append(
-                                RoutingChannel(
-                                    segment_id=channel_id,
-                                    direction="vertical", 
-                                    length=1,
-                                    capacity=chan_width
-                                )
-                            )
-                            channel_id += 1
-        
-        return routing_channels
+    @staticmethod
+    def _channel_directions(width: int, height: int) -> List[str]:
+        """Smerovi kanala redom kao u petlji po x pa y (horizontalni pa vertikalni)
+        
+        Redosled je potpuno određen dimenzijama: svaka kolona osim poslednje
+        daje H, V naizmenično i na kraju H; poslednja kolona samo V.
+        """
+        if width <= 0 or height <= 0:
+            return []
+        column = [_HORIZONTAL, _VERTICAL] * (height - 1) + [_HORIZONTAL]
+        return column * (width - 1) + [_VERTICAL] * (height - 1)
     
-    def _parse_grid_locations(self, root: ET.Element, architecture: FPGAArchitecture):
-        """Parsira grid lokacije i ažurira pozicije logic blocks"""
-        grid_element = root.find('grid')
-        if grid_element is None:
-            return
-        
-        # Mapa block_type_id -> LogicBlock
-        block_type_map = {block.block_type_id: block for block in architecture.logic_blocks 
-                         if hasattr(block, 'block_type_id')}
-        
-        for grid_loc in grid_element.findall('grid_loc'):
-            block_type_id = int(grid_loc.get('block_type_id', '0'))
-            x = int(grid_loc.get('x', '0'))
-            y = int(grid_loc.get('y', '0'))
-            
-            if block_type_id in block_type_map:
-                block = block_type_map[block_type_id]
-                block.x = x
-                block.y = y
-                block.name = f"{block.type}_{x}_{y}"
+    def _build_channels(self, width: int, height: int, chan_width) -> List[RoutingChannel]:
+        """Pravi routing kanale na osnovu grid dimenzija"""
+        # Kanali se prave iz torki (RoutingChannel.from_row), bez **kwargs poziva
+        new_channel = RoutingChannel.from_row
+        return [new_channel((channel_id, direction, 1, chan_width))
+                for channel_id, direction in enumerate(self._channel_directions(width, height))]
     
-    def _parse_rrg_parameters(self, root: ET.Element) -> Dict[str, str]:
-        """Parsira parametre iz RRG fajla"""
-        parameters = {}
-        
-        # Dodavanje osnovnih informacija
-        parameters['tool_name'] = root.get('tool_name', '')
-        parameters['tool_version'] = root.get('tool_version', '')
-        
-        # Informacije o channelima
-        channels = root.find('channels')
-        if channels is not None:
-            channel_elem = channels.find('channel')
-            if channel_elem is not None:
-                parameters['chan_width_max'] = channel_elem.get('chan_width_max', '')
-                parameters['grid_width'] = str(self._parse_grid_width(root))
-                parameters['grid_height'] = str(self._parse_grid_height(root))
+    def _build_logic_blocks(self, block_types: Dict[int, Tuple[str, int, int]],
+                            grid_locs: List[Tuple[int, int, int]]) -> List[LogicBlock]:
+        """Pravi po jedan LogicBlock za svaku (block_type_id, x, y) grid lokaciju
         
-        # Informacije o switch-evima
-        switches = root.find('switches')
-        if switches is not None:
-            parameters['switch_count'] = str(len(switches.findall('switch')))
-        
-        # Informacije o segmentima
-        segments = root.find('segments')
-        if segments is not None:
-            parameters['segment_count'] = str(len(segments.findall('segment')))
-        
-        return parameters
+        Lokacije sa nepoznatim block_type_id se preskaču.
+        """
+        logic_blocks = []
+        append = logic_blocks.append
+        new_block = LogicBlock.from_row
+        for block_type_id, x, y in grid_locs:
+            template = block_types.get(block_type_id)
+            if template is None:
+                continue
+            name, inputs, outputs = template
+            append(new_block((name, x, y, inputs, outputs, f"{name}_{x}_{y}"),
+                             {'block_type_id': block_type_id}))
+        return logic_blocks
 
     def parse_simple_architecture(self, width: int, height: int) -> FPGAArchitecture:
         """Kreira jednostavnu FPGA arhitekturu za testiranje"""
@@ -213,61 +202,19 @@ class ArchitectureParser:
         # - CLB blokovi u unutrašnjosti 
         # - IZUZETI uglove: (0,0), (0,width-1), (width-1,0), (width-1,width-1)
         corners = {(0, 0), (0, width-1), (width-1, 0), (width-1, width-1)}
-        
-        for x in range(width):
-            for y in range(height):
-                # Preskoči uglove - ne kreiraj blokove na uglovima
-                if (x, y) in corners:
-                    continue
-                
-                # Proveri da li je ivična pozicija (IO blok)
-                is_edge = (x == 0 or x == width-1 or y == 0 or y == height-1)
-                
-                if is_edge:
-                    architecture.logic_blocks.append(
-                        LogicBlock(
-                            type="IO",
-                            x=x,
-                            y=y,
-                            inputs=1,
-                            outputs=1,
-                            name=f"IO_{x}_{y}"
-                        )
-                    )
-                else:
-                    architecture.logic_blocks.append(
-                        LogicBlock(
-                            type="CLB",
-                            x=x,
-                            y=y,
-                            inputs=4,
-                            outputs=2,
-                            name=f"CLB_{x}_{y}"
-                        )
-                    )
+        new_block = LogicBlock.from_row
+        edge_columns = {0, width - 1}
+        edge_rows = {0, height - 1}
+        architecture.logic_blocks = [
+            new_block(("IO", x, y, 1, 1, f"IO_{x}_{y}"))
+            if x in edge_columns or y in edge_rows else
+            new_block(("CLB", x, y, 4, 2, f"CLB_{x}_{y}"))
+            for x in range(width)
+            for y in range(height)
+            if (x, y) not in corners
+        ]
         
         # Dodavanje routing channels
-        channel_id = 0
-        for x in range(width):
-            for y in range(height):
-                if x < width - 1:
-                    architecture.routing_channels.append(
-                        RoutingChannel(
-                            segment_id=channel_id,
-                            direction="horizontal",
-                            length=1
-                        )
-                    )
-                    channel_id += 1
-                
-                if y < height - 1:
-                    architecture.routing_channels.append(
-                        RoutingChannel(
-                            segment_id=channel_id,
-                            direction="vertical",
-                            length=1
-                        )
-                    )
-                    channel_id += 1
+        architecture.routing_channels = self._build_channels(width, height, None)
         
-        return architecture
\ No newline at end of file
+        return architecture
@@ -2,6 +2,7 @@ import re
 import xml.etree.ElementTree as ET
 from typing import Dict, List, Tuple, Set, Optional, Any
 import re
+import logging
 import traceback
 import xml.etree.ElementTree as ET
 
@@ -10,6 +11,17 @@ from models.routing import NetRoute, RouteSegment, RoutingResult
 from models.fpga_architecture import FPGAArchitecture
 from models.circuit import Circuit, Point, Signal, Component
 
+logger = logging.getLogger(__name__)
+
+def parse_routing_file_worker(filepath: str) -> RoutingResult:
+    """Parsira .route fajl u zasebnom procesu (ProcessPoolExecutor)
+    
+    Parser arhitekturu i kolo samo upisuje u rezultat, pa se oni ne šalju
+    procesu; pozivalac ih posle vezuje za vraćeni rezultat. Stabla ruta se
+    pakuju bez rekurzije (NetRoute.__getstate__), pa dubina stabla nije bitna.
+    """
+    return RoutingParser().parse_routing_file(filepath, architecture=None)
+
 class RoutingParser:
     """Parser za VTR routing fajlove (.route) i RRG fajlove"""
     
@@ -31,8 +43,9 @@ class RoutingParser:
             routes = []
             congestion = {}
             
-            print("=" * 60)
-            print("🔍 Starting .route file parsing...")
+            logger.info("🔍 Starting .route file parsing...")
+            # Detaljni ispis po netu/čvoru samo kada je DEBUG uključen
+            verbose = logger.isEnabledFor(logging.DEBUG)
             
             with open(filepath, 'r', encoding='utf-8') as f:
                 lines = f.readlines()
@@ -56,15 +69,15 @@ class RoutingParser:
                         route.build_tree_from_segments()
                         routes.append(route)
                         
-                        print(f"✅ Net '{current_net_name}': {len(current_segments)} segments")
-                        if route.root:
-                            paths = route.get_all_source_to_sink_paths()
-                            print(f"   🌳 Tree built: {len(paths)} paths to SINK")
+                        if verbose:
+                            logger.debug("✅ Net '%s': %d segments", current_net_name, len(current_segments))
+                            if route.root:
+                                logger.debug("   🌳 Tree built: %d paths to SINK", route.fanout)
                     
                     net_id = net_match.group(1)
                     current_net_name = net_match.group(2)
                     current_segments = []
-                    print(f"\n📌 Starting Net {net_id} ({current_net_name})")
+                    logger.debug("📌 Starting Net %s (%s)", net_id, current_net_name)
                     continue
                 
                 if line.startswith("Node:"):
@@ -84,20 +97,18 @@ class RoutingParser:
                 route.build_tree_from_segments()
                 routes.append(route)
                 
-                print(f"✅ Net '{current_net_name}': {len(current_segments)} segments")
-                if route.root:
-                    paths = route.get_all_source_to_sink_paths()
-                    print(f"   🌳 Tree built: {len(paths)} paths to SINK")
+                if verbose:
+                    logger.debug("✅ Net '%s': %d segments", current_net_name, len(current_segments))
+                    if route.root:
+                        logger.debug("   🌳 Tree built: %d paths to SINK", route.fanout)
             
-            print("=" * 60)
-            print(f"🎯 PARSING COMPLETE: {len(routes)} nets parsed")
+            logger.info("🎯 PARSING COMPLETE: %d nets parsed", len(routes))
             
-            stats = self._calculate_tree_statistics(routes)
-            print(f"📊 Tree Statistics:")
-            print(f"   - Nets with branches: {stats['nets_with_branches']}")
-            print(f"   - Max fanout: {stats['max_fanout']}")
-            print(f"   - Avg path length: {stats['avg_path_length']:.2f}")
-            print("=" * 60)
+            # Statistika obilazi sve putanje, pa se računa samo kada se ispisuje
+            if verbose:
+                stats = self._calculate_tree_statistics(routes)
+                logger.debug("📊 Tree Statistics: nets with branches=%d, max fanout=%d, avg path length=%.2f",
+                             stats['nets_with_branches'], stats['max_fanout'], stats['avg_path_length'])
             
             if congestion:
                 max_cong = max(congestion.values())
@@ -199,17 +210,18 @@ class RoutingParser:
             )
             
             # Debug: IO pad detekcija
-            if node_type in ['SOURCE', 'SINK', 'OPIN', 'IPIN'] and hasattr(seg, 'pad') and seg.pad >= 0:
-                print(f"    🔌 IO PAD detected: Node {node_id} has pad={seg.pad}")
-            
-            track_str = f"trk={track}" if track >= 0 else ""
-            switch_str = f"sw={switch_id}" if switch_id != 0 else ""
-            print(f"    Node {node_id:4d}: {node_type:6s} ({x},{y}) {track_str} {switch_str}")
+            if logger.isEnabledFor(logging.DEBUG):
+                if node_type in ['SOURCE', 'SINK', 'OPIN', 'IPIN'] and hasattr(seg, 'pad') and seg.pad >= 0:
+                    logger.debug("    🔌 IO PAD detected: Node %d has pad=%s", node_id, seg.pad)
+                
+                track_str = f"trk={track}" if track >= 0 else ""
+                switch_str = f"sw={switch_id}" if switch_id != 0 else ""
+                logger.debug("    Node %4d: %-6s (%d,%d) %s %s", node_id, node_type, x, y, track_str, switch_str)
             
             return seg
             
         except Exception as e:
-            print(f"⚠️ Line {line_num}: Error parsing '{line[:80]}...' - {e}")
+            logger.warning("⚠️ Line %d: Error parsing '%s...' - %s", line_num, line[:80], e)
             return None
         
     def _parse_placement_info(self, content: str, routing_result: RoutingResult):
@@ -557,7 +569,7 @@ class RoutingParser:
                 json.dump(summary, f, indent=2)
                 
         except Exception as e:
-            print(f"Error exporting routing summary: {e}")
+            logger.error("Error exporting routing summary: %s", e)
 
     def _calculate_tree_statistics(self, routes: List[NetRoute]) -> Dict[str, Any]:
         """Računa statistiku routing stabala"""
@@ -602,14 +614,14 @@ class RoutingParser:
                     "paths": route.get_path_coordinates(),
                     "tree": route.root.to_dict(include_children=True) if route.root else None,
                     "segment_count": len(route.segments),
-                    "fanout": len(route.get_all_source_to_sink_paths()) if route.root else 0
+                    "fanout": route.fanout
                 }
                 data["nets"].append(net_data)
             
             with open(output_path, 'w') as f:
                 json.dump(data, f, indent=2)
             
-            print(f"✅ Exported routing trees to {output_path}")
+            logger.info("✅ Exported routing trees to %s", output_path)
             
         except Exception as e:
-            print(f"❌ Error exporting routing trees: {e}")
\ No newline at end of file
+            logger.error("❌ Error exporting routing trees: %s", e)
\ No newline at end of file
@@ -406,8 +406,13 @@ class FPGAVisualizer {
 
             const data = await response.json();
             
-            if (data.success && data.image_path) {
-                this.renderImage(data.image_path);
+            // 202: slika se crta u radnom procesu, čeka se na /result/<id>
+            if (response.status === 202 && data.result_url) {
+                await this.waitForResult(data.result_url);
+            }
+            
+            if (data.success && data.image_url) {
+                this.renderImage(data.image_url);
                 this.showMessage(`Vizuelizovano ${data.signals_visualized} signala`, 'success');
             } else {
                 throw new Error(data.error || 'Nepoznata greška');
@@ -419,6 +424,21 @@ class FPGAVisualizer {
         }
     }
 
+    async waitForResult(url, intervalMs = 500) {
+        // Proverava posao dok server vraća 202; 200 znači da je slika gotova
+        for (;;) {
+            const response = await fetch(url, { cache: 'no-store' });
+            if (response.status === 200) {
+                return;
+            }
+            if (response.status !== 202) {
+                const error = await response.json().catch(() => ({}));
+                throw new Error(error.error || `HTTP ${response.status}`);
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    }
+
     onCircuitFileSelected() {
         const fileInput = document.getElementById('circuitFile');
         if (fileInput.files.length > 0) {
@@ -551,10 +571,17 @@ class FPGAVisualizer {
             return;
         }
 
-        // ✅ Samo ime fajla (bez putanje)
-        const safe = filename.replace(/^static\/output\//, '').replace(/\\/g, '/');
-        const url = `/download/${encodeURIComponent(safe)}`;
-        const bust = `?t=${Date.now()}`;
+        // /img/<id> je slika iz memorije servera (ključ se menja sa sadržajem);
+        // inače samo ime fajla iz OUTPUT foldera (bez putanje)
+        let url, bust;
+        if (filename.startsWith('/img/')) {
+            url = filename;
+            bust = '';
+        } else {
+            const safe = filename.replace(/^static\/output\//, '').replace(/\\/g, '/');
+            url = `/download/${encodeURIComponent(safe)}`;
+            bust = `?t=${Date.now()}`;
+        }
 
         console.log(`🖼️ Učitavam sliku: ${url}${bust}`);  // DEBUG
 
@@ -1,15 +1,55 @@
+import io
 import os
 import random
+import logging
+import threading
 import matplotlib
 matplotlib.use("Agg")
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.lines import Line2D
-from typing import Dict, Optional, List, Tuple
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.path import Path
+from matplotlib.transforms import IdentityTransform
+from matplotlib.colors import to_rgba
+from typing import BinaryIO, Dict, Optional, List, Tuple
 
 from models.fpga_architecture import FPGAArchitecture
 from models.routing import RoutingResult, RouteSegment
-from config.settings import settings
+from config.settings import CELL_SIZE, SIGNAL_COLORS, HEATMAP_ANTIALIASED
+
+logger = logging.getLogger(__name__)
+
+# rcParams za heat mapu bez antialiasing-a (HEATMAP_ANTIALIASED = False);
+# Agg tada ne računa pokrivenost ivica, a duge putanje crta u delovima
+_FAST_HEATMAP_RC = {
+    'lines.antialiased': False,
+    'patch.antialiased': False,
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+}
+
+# Vizuelizator radnog procesa (render_routing_worker); pravi se pri prvom poslu
+_worker_visualizer = None
+
+
+def render_routing_worker(architecture: FPGAArchitecture, routing: RoutingResult,
+                          options: Dict) -> bytes:
+    """Crta rutiranje u zasebnom procesu (ProcessPoolExecutor)
+    
+    Proces drži jedan SignalVisualizer, pa se figura ponovo koristi između
+    poslova kao i u niti zahteva. Vraća PNG bajtove (ništa se ne piše na disk).
+    """
+    global _worker_visualizer
+    if _worker_visualizer is None:
+        _worker_visualizer = SignalVisualizer()
+    buffer = io.BytesIO()
+    _worker_visualizer.visualize_routing(architecture, routing, None,
+                                         output_buffer=buffer, **options)
+    return buffer.getvalue()
 
 
 class SignalVisualizer:
@@ -35,20 +75,28 @@ class SignalVisualizer:
     }
 
     def __init__(self):
-        self.TILE_SIZE = getattr(settings, "CELL_SIZE", 100)  # Increased from 80 to 100
+        self.TILE_SIZE = CELL_SIZE  # Increased from 80 to 100
         self.CLB_SIZE = int(self.TILE_SIZE * 0.50)  # Back to normal size - problem was missing blocks, not size
         self.IO_SIZE = int(self.TILE_SIZE * 0.45)   # Back to normal size
         self.TRACK_COUNT = 8  # 8 tracks per channel with better spacing
-        self.ROUTE_COLORS = getattr(settings, "SIGNAL_COLORS",
-                                    ["#e41a1c", "#377eb8", "#4daf4a", "#ff7f00", "#984ea3", "#00aa7f"])
+        self.ROUTE_COLORS = SIGNAL_COLORS
         self.fig = None
         self.ax = None
         self.architecture = None
+        # Jedna figura se pravi jednom i čisti (clf) između crtanja;
+        # lock serijalizuje crtanje jer je instanca deljena između niti zahteva
+        self._figure = Figure()
+        FigureCanvasAgg(self._figure)
+        self._render_lock = threading.Lock()
+        # Duži koje se crtaju jednim LineCollection-om po zorder-u (vidi _add_line)
+        self._line_batches = {}
+        # Markeri koji se crtaju jednim Line2D po stilu (vidi _add_marker)
+        self._marker_batches = {}
 
     def visualize_routing(self,
                           architecture: FPGAArchitecture,
                           routing: RoutingResult,
-                          output_path: str,
+                          output_path: Optional[str],
                           show_grid: bool = True,
                           show_segment_ids: bool = True,
                           show_legend: bool = True,
@@ -61,64 +109,76 @@ class SignalVisualizer:
                           architecture_file: str = None,
                           routing_file: str = None,
                           filter_type: str = None,
-                          filter_value: int = None):
-        w, h = architecture.width, architecture.height
+                          filter_value: int = None,
+                          output_buffer: Optional[BinaryIO] = None):
+        """Crta rutiranje i snima PNG u output_path, ili u output_buffer ako je zadat"""
+        # rcParams moraju važiti i pri pravljenju artista i pri savefig
+        rc = _FAST_HEATMAP_RC if show_heatmap and not HEATMAP_ANTIALIASED else None
+        with self._render_lock, matplotlib.rc_context(rc):
+            w, h = architecture.width, architecture.height
         
-        self.architecture = architecture
+            self.architecture = architecture
         
-        # Reset arrows tracking for new visualization
-        self.arrows_drawn = set()
+            # Reset arrows tracking for new visualization
+            self.arrows_drawn = set()
+            self._line_batches = {}
+            self._marker_batches = {}
 
-        margin = self.TILE_SIZE
+            margin = self.TILE_SIZE
 
-        # Adjusted for proper 8x8 grid (no extra border)
-        width_px = w * self.TILE_SIZE + 2 * margin
-        height_px = h * self.TILE_SIZE + 2 * margin
-        
-        dpi = 100
-        self.fig = plt.figure(figsize=(width_px/dpi, height_px/dpi), dpi=dpi)
-        
-        self.ax = self.fig.add_axes([0, 0, 1, 1])
-        self.ax.set_facecolor("white")
-        self.fig.patch.set_facecolor("white")
+            # Adjusted for proper 8x8 grid (no extra border)
+            width_px = w * self.TILE_SIZE + 2 * margin
+            height_px = h * self.TILE_SIZE + 2 * margin
+        
+            dpi = 100
+            self.fig = self._figure
+            self.fig.clf()
+            self.fig.set_dpi(dpi)
+            self.fig.set_size_inches(width_px/dpi, height_px/dpi)
+        
+            self.ax = self.fig.add_axes([0, 0, 1, 1])
+            self.ax.set_facecolor("white")
+            self.fig.patch.set_facecolor("white")
 
-        self.ax.set_xlim(-margin, w * self.TILE_SIZE + margin)
-        self.ax.set_ylim(-margin, h * self.TILE_SIZE + margin)
-        self.ax.set_aspect('equal')
-        self.ax.axis('off')
-        self.ax.margins(0)
-        
-        self.ax.autoscale(False)
-        self.ax.set_adjustable('box')
+            self.ax.set_xlim(-margin, w * self.TILE_SIZE + margin)
+            self.ax.set_ylim(-margin, h * self.TILE_SIZE + margin)
+            self.ax.set_aspect('equal')
+            self.ax.axis('off')
+            self.ax.margins(0)
+        
+            self.ax.autoscale(False)
+            self.ax.set_adjustable('box')
 
-        if show_grid:
-            self._draw_background_grid(w, h)
+            if show_grid:
+                self._draw_background_grid(w, h)
 
-        # Izračunaj HPWL statistike za svaki blok ako je heat mapa uključena
-        block_hpwl_stats = None
-        if show_heatmap and routing:
-            block_hpwl_stats = self._calculate_block_hpwl_coverage(routing, w, h)
+            # Izračunaj HPWL statistike za svaki blok ako je heat mapa uključena
+            block_hpwl_stats = None
+            if show_heatmap and routing:
+                block_hpwl_stats = self._calculate_block_hpwl_coverage(routing, w, h)
 
-        self._draw_blocks(w, h, block_hpwl_stats)
-        self._draw_tracks(w, h)
+            self._draw_blocks(w, h, block_hpwl_stats)
+            self._draw_tracks(w, h)
         
-        # Prikaži obojene bounding boxove ako je checkbox uključen
-        if show_bounding_boxes:
-            self._draw_bounding_boxes(routing, show_bounding_box_labels)
+            # Prikaži obojene bounding boxove ako je checkbox uključen
+            if show_bounding_boxes:
+                self._draw_bounding_boxes(routing, show_bounding_box_labels)
         
-        # Prikaži signale (rute i čvorove) samo ako je checkbox uključen
-        if show_signals:
-            self._draw_routes(routing, architecture, show_segment_ids, show_directions, show_signal_labels)
+            # Prikaži signale (rute i čvorove) samo ako je checkbox uključen
+            if show_signals:
+                self._draw_routes(routing, architecture, show_segment_ids, show_directions, show_signal_labels)
 
-        if show_legend and routing and routing.routes and show_signals:
-            self._draw_legend(routing)
+            if show_legend and routing and routing.routes and show_signals:
+                self._draw_legend(routing)
+        
+            self._flush_lines()
         
-        # Dodaj naslov i podnaslov na osnovu opcija
-        self._add_title_and_subtitle(show_heatmap, show_signals, show_bounding_boxes, 
-                                     architecture_file, routing_file, filter_type, filter_value)
+            # Dodaj naslov i podnaslov na osnovu opcija
+            self._add_title_and_subtitle(show_heatmap, show_signals, show_bounding_boxes, 
+                                         architecture_file, routing_file, filter_type, filter_value)
         
-        self._save(output_path, dpi)
-        return self.fig
+            self._save(output_path, dpi, output_buffer)
+            return self.fig
     
     def _calculate_block_hpwl_coverage(self, routing: RoutingResult, width: int, height: int) -> Dict:
         """
@@ -244,15 +304,58 @@ class SignalVisualizer:
         return track_x
 
     # ---------- Drawing ----------
+    def _add_line(self, xs, ys, color, linewidth: float, alpha: float = None, zorder: float = 2):
+        """Dodaje duž u grupu za dati zorder; crta se tek u _flush_lines"""
+        batch = self._line_batches.setdefault(zorder, ([], [], []))
+        batch[0].append(((xs[0], ys[0]), (xs[1], ys[1])))
+        batch[1].append(to_rgba(color, alpha))
+        batch[2].append(linewidth)
+
+    def _add_marker(self, x: float, y: float, marker: str, color, markersize: float, zorder: float = 2):
+        """Dodaje marker u grupu istog stila; crta se tek u _flush_lines"""
+        batch = self._marker_batches.setdefault(zorder, ([], [], [], []))
+        batch[0].append((x, y))
+        batch[1].append(self._marker_path(marker))
+        batch[2].append(to_rgba(color))
+        batch[3].append(markersize ** 2)
+
+    @staticmethod
+    def _marker_path(marker: str) -> Path:
+        """Putanja markera u jedinicama kakve koristi scatter (veličina je u tačkama)"""
+        style = MarkerStyle(marker)
+        return style.get_path().transformed(style.get_transform())
+
+    def _flush_lines(self):
+        """Crta sve prikupljene duži (po jedan LineCollection za svaki zorder) i markere
+        
+        Boja, alfa i debljina su po duži, pa se redosled crtanja unutar
+        zorder-a ne menja u odnosu na pojedinačne ax.plot pozive.
+        """
+        for zorder, (segs, colors, widths) in self._line_batches.items():
+            self.ax.add_collection(
+                LineCollection(segs, colors=colors, linewidths=widths, zorder=zorder,
+                               capstyle='projecting', joinstyle='round'),
+                autolim=False)
+        self._line_batches = {}
+        
+        # Markeri su jedan PathCollection po zorder-u; putanja, boja i veličina
+        # su po markeru, pa se preklapanje izvora i ponora crta istim redom
+        for zorder, (offsets, paths, colors, sizes) in self._marker_batches.items():
+            self.ax.add_collection(
+                PathCollection(paths, sizes=sizes, offsets=offsets, offset_transform=self.ax.transData,
+                               transform=IdentityTransform(),
+                               facecolors=colors, edgecolors=colors, linewidths=1.0,
+                               joinstyle='miter', snap=True, zorder=zorder),
+                autolim=False)
+        self._marker_batches = {}
+
     def _draw_background_grid(self, width: int, height: int):
         for x in range(width + 1):
             gx = x * self.TILE_SIZE
-            self.ax.plot([gx, gx], [0, height * self.TILE_SIZE],
-                         color="#e8e8e8", linewidth=0.5, zorder=0)
+            self._add_line([gx, gx], [0, height * self.TILE_SIZE], color="#e8e8e8", linewidth=0.5, zorder=0)
         for y in range(height + 1):
             gy = y * self.TILE_SIZE
-            self.ax.plot([0, width * self.TILE_SIZE], [gy, gy],
-                         color="#e8e8e8", linewidth=0.5, zorder=0)
+            self._add_line([0, width * self.TILE_SIZE], [gy, gy], color="#e8e8e8", linewidth=0.5, zorder=0)
 
     def _draw_blocks(self, width: int, height: int, block_hpwl_stats: Dict = None):
         """Draw blocks based on standard FPGA layout - IO on edges (excluding corners), CLB in interior"""
@@ -426,8 +529,7 @@ class SignalVisualizer:
                 track_area_start = gap_center_y - usable_gap / 2
                 for t in range(self.TRACK_COUNT):
                     y = track_area_start + (t + 1) * track_spacing
-                    self.ax.plot([track_start_x, track_end_x], [y, y], 
-                                color="#000000", linewidth=1.0, alpha=0.7, zorder=1)
+                    self._add_line([track_start_x, track_end_x], [y, y], color="#000000", linewidth=1.0, alpha=0.7, zorder=1)
 
         # Vertikalni trackovi (CHANY) - kratke trake u svakom vertikalnom gap-u  
         for col in range(width - 1):  # Between adjacent columns
@@ -475,8 +577,7 @@ class SignalVisualizer:
                 track_area_start = gap_center_x - usable_gap / 2
                 for t in range(self.TRACK_COUNT):
                     x = track_area_start + (t + 1) * track_spacing
-                    self.ax.plot([x, x], [track_start_y, track_end_y],
-                                color="#000000", linewidth=1.0, alpha=0.7, zorder=1)
+                    self._add_line([x, x], [track_start_y, track_end_y], color="#000000", linewidth=1.0, alpha=0.7, zorder=1)
 
         # Switch blokovi (SB) - beli kvadrati na presecima
         # Avoid drawing on outside edges and between IO blocks
@@ -627,11 +728,9 @@ class SignalVisualizer:
                         prev_connect_point = segment_endpoints[-2][1]  # prevEnd
                         curr_connect_point = segment_endpoints[-1][0]  # currStart
                     
-                    self.ax.plot([prev_connect_point[0], curr_connect_point[0]], [prev_connect_point[1], curr_connect_point[1]], 
-                                '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                    self._add_line([prev_connect_point[0], curr_connect_point[0]], [prev_connect_point[1], curr_connect_point[1]], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
                 
-                self.ax.plot([gap_start_x, gap_end_x], [track_y, track_y], '-', 
-                            color=color, linewidth=linewidth, alpha=0.95, zorder=8)
+                self._add_line([gap_start_x, gap_end_x], [track_y, track_y], color=color, linewidth=linewidth, alpha=0.95, zorder=8)
                 
                 # Add direction arrow for CHANX based on signal flow
                 if show_directions:
@@ -705,11 +804,9 @@ class SignalVisualizer:
                         prev_connect_point = segment_endpoints[-2][1]  # prevEnd
                         curr_connect_point = segment_endpoints[-1][0]  # currStart
                     
-                    self.ax.plot([prev_connect_point[0], curr_connect_point[0]], [prev_connect_point[1], curr_connect_point[1]], 
-                                '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                    self._add_line([prev_connect_point[0], curr_connect_point[0]], [prev_connect_point[1], curr_connect_point[1]], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
                 
-                self.ax.plot([track_x, track_x], [gap_start_y, gap_end_y], '-', 
-                            color=color, linewidth=linewidth, alpha=0.95, zorder=8)
+                self._add_line([track_x, track_x], [gap_start_y, gap_end_y], color=color, linewidth=linewidth, alpha=0.95, zorder=8)
                 
                 # Add direction arrow for CHANY based on signal flow
                 if show_directions:
@@ -723,7 +820,7 @@ class SignalVisualizer:
             elif seg_type == 'SOURCE':
                 pos = self._get_node_position(seg)
                 if pos[0] >= 0 and pos[1] >= 0:
-                    self.ax.plot(pos[0], pos[1], 's', color='red', markersize=8, zorder=15)
+                    self._add_marker(pos[0], pos[1], 's', color='red', markersize=8, zorder=15)
                     
                     # Connect SOURCE to next routing segment (CHANX or CHANY) if exists
                     if i + 1 < len(segments):
@@ -741,20 +838,18 @@ class SignalVisualizer:
                                 # Vertical connection to CHANX
                                 track_y = self.chanx_y_for_track(routing_seg.y, routing_seg.track)
                                 chanx_center_x = (routing_seg.x + 0.5) * self.TILE_SIZE
-                                self.ax.plot([pos[0], chanx_center_x], [pos[1], track_y], 
-                                            '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                                self._add_line([pos[0], chanx_center_x], [pos[1], track_y], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
                             elif routing_type == 'CHANY':
                                 # Horizontal connection to CHANY
                                 track_x = self.chany_x_for_track(routing_seg.x, routing_seg.track)
                                 chany_center_y = (routing_seg.y + 0.5) * self.TILE_SIZE
-                                self.ax.plot([pos[0], track_x], [pos[1], chany_center_y], 
-                                            '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                                self._add_line([pos[0], track_x], [pos[1], chany_center_y], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
             
             # Draw SINK markers  
             elif seg_type == 'SINK':
                 pos = self._get_node_position(seg)
                 if pos[0] >= 0 and pos[1] >= 0:
-                    self.ax.plot(pos[0], pos[1], '^', color='#00e400', markersize=8, zorder=15)
+                    self._add_marker(pos[0], pos[1], '^', color='#00e400', markersize=8, zorder=15)
                     
                     # Connect SINK to previous routing segment (CHANX or CHANY) if exists
                     if i > 0:
@@ -772,14 +867,12 @@ class SignalVisualizer:
                                 # Vertical connection from CHANX
                                 track_y = self.chanx_y_for_track(routing_seg.y, routing_seg.track)
                                 chanx_center_x = (routing_seg.x + 0.5) * self.TILE_SIZE
-                                self.ax.plot([chanx_center_x, pos[0]], [track_y, pos[1]], 
-                                            '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                                self._add_line([chanx_center_x, pos[0]], [track_y, pos[1]], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
                             elif routing_type == 'CHANY':
                                 # Horizontal connection from CHANY
                                 track_x = self.chany_x_for_track(routing_seg.x, routing_seg.track)
                                 chany_center_y = (routing_seg.y + 0.5) * self.TILE_SIZE
-                                self.ax.plot([track_x, pos[0]], [pos[1], chany_center_y], 
-                                            '-', color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
+                                self._add_line([track_x, pos[0]], [pos[1], chany_center_y], color=color, linewidth=linewidth-1, alpha=0.8, zorder=7)
         
         # Crta labelu signala ako je route_label prosleđen
         if route_label:
@@ -940,8 +1033,7 @@ class SignalVisualizer:
             x1, y1 = points[i]
             x2, y2 = points[i + 1]
             
-            self.ax.plot([x1, x2], [y1, y2], '-', 
-                        color=color, linewidth=linewidth, alpha=alpha, zorder=7)
+            self._add_line([x1, x2], [y1, y2], color=color, linewidth=linewidth, alpha=alpha, zorder=7)
             
             # Strelica samo za CHANX/CHANY
             if show_directions and seg_type in ['CHANX', 'CHANY']:
@@ -1054,7 +1146,9 @@ class SignalVisualizer:
         # Debug ispis samo za krajnje segmente
         connects_result = self._connects_to_start(current_seg, next_seg, seg_type)
         if next_seg.node_type.upper() in ['IPIN', 'SINK']:
-            print(f"FINAL SEGMENT: {seg_type}({current_seg.x},{current_seg.y}) -> {next_seg.node_type.upper()}({next_seg.x},{next_seg.y}), connects_to_start={connects_result}")
+            logger.debug("FINAL SEGMENT: %s(%d,%d) -> %s(%d,%d), connects_to_start=%s",
+                         seg_type, current_seg.x, current_seg.y, next_seg.node_type.upper(),
+                         next_seg.x, next_seg.y, connects_result)
         
         # Sredina trenutnog segmenta
         mid_x = (start_x + end_x) / 2
@@ -1108,7 +1202,7 @@ class SignalVisualizer:
             (curr_seg_type == 'CHANY' and curr_x == 4 and curr_y == 1) or
             (curr_seg_type == 'CHANX' and curr_x == 3 and curr_y == 3) or
             (curr_seg_type == 'CHANX' and curr_x == 5 and curr_y == 1)):
-            print(f"NET0 DEBUG: {curr_seg_type}({curr_x},{curr_y}) -> {next_seg_type}({next_x},{next_y})")
+            logger.debug("NET0 DEBUG: %s(%s,%s) -> %s(%s,%s)", curr_seg_type, curr_x, curr_y, next_seg_type, next_x, next_y)
         
         # Analizirajmo svaki slučaj iz Net 10 primera:
         
@@ -1506,14 +1600,18 @@ class SignalVisualizer:
                             ),
                             zorder=100)
 
-    def _save(self, path: str, dpi: int):
-        # Only create directory if path contains a directory component
-        dir_path = os.path.dirname(path)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
+    def _save(self, path: Optional[str], dpi: int, buffer: Optional[BinaryIO] = None):
+        if buffer is not None:
+            # PNG ostaje u memoriji (npr. za /img/<id>), bez upisa na disk
+            path = buffer
+        else:
+            # Only create directory if path contains a directory component
+            dir_path = os.path.dirname(path)
+            if dir_path:
+                os.makedirs(dir_path, exist_ok=True)
         
         self.fig.savefig(path, format='png', dpi=dpi, facecolor="white", 
                         pad_inches=0, bbox_inches=None)
-        plt.close(self.fig)
+        self.fig.clf()
         self.fig = None
         self.ax = None
\ No newline at end of file